@@ -0,0 +1,8 @@
+"""End-to-end benchmarks: synthetic databases built through the real
+migrations, and the app driven in-process through aiohttp's test client.
+
+Run from the repository root::
+
+    python -m benchmarks --scale small medium --output results.json
+    python -m benchmarks --startup
+"""
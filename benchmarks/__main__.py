@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from benchmarks.generate import SCALES
+from benchmarks.run import metadata, run
+from benchmarks.startup import startup
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the API end to end.")
+parser.add_argument("--scale", nargs="+", choices=sorted(SCALES), default=["small"])
+parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+parser.add_argument("--concurrency", type=int, default=8)
+parser.add_argument("--no-cache", dest="cache", action="store_false", help="bypass the response cache")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--output", type=Path, help="write the results here as JSON")
+parser.add_argument("--startup", action="store_true", help="time cold starts instead")
+parser.add_argument("--repeat", type=int, default=5, help="cold starts to take the median of")
+args = parser.parse_args()
+
+if args.startup:
+    results = {"meta": metadata({"startup": True, "repeat": args.repeat}), "startup": startup(args.repeat)}
+else:
+    results = asyncio.run(run(args.scale, args.requests, args.concurrency, args.cache, args.seed))
+if args.output:
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"wrote {args.output}")
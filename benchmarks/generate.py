@@ -0,0 +1,101 @@
+"""Builds a synthetic database: teams, players, officials and tournaments
+with R rounds of B boards each, every round but the last one resolved."""
+import random
+import sqlite3
+from pathlib import Path
+from typing import Dict, List
+
+from chess_data_api.database import migrate
+from chess_data_api.ids import IdGenerator
+
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"teams": 8, "players": 200, "officials": 5, "tournaments": 5, "rounds": 5, "boards": 20},
+    "medium": {"teams": 32, "players": 2000, "officials": 20, "tournaments": 20, "rounds": 7, "boards": 50},
+    "large": {"teams": 100, "players": 20000, "officials": 50, "tournaments": 50, "rounds": 9, "boards": 200},
+}
+
+
+def generate(path: Path, teams: int, players: int, officials: int, tournaments: int, rounds: int, boards: int,
+             seed: int = 0) -> Dict[str, List[int]]:
+    """Writes the data set to a fresh database at ``path`` and returns the
+    ids the benchmark needs, including the unresolved games of the last
+    round of each tournament."""
+    rng = random.Random(seed)
+    ids = IdGenerator()
+    migrate(path)
+    conn = sqlite3.connect(path)
+
+    team_ids = ids.allocate(2, teams)
+    conn.executemany(
+        "INSERT INTO teams (id, name, sponsor_name) VALUES (?, ?, ?)",
+        [(id, f"Team {n}", f"Sponsor {n}") for n, id in enumerate(team_ids)]
+    )
+    player_ids = ids.allocate(1, players)
+    player_team = {id: team_ids[n % teams] for n, id in enumerate(player_ids)}
+    conn.executemany(
+        "INSERT INTO players (id, name, grade, team) VALUES (?, ?, ?, ?)",
+        [(id, f"Player {n} Surname{n % 97}", 9 + n % 4, player_team[id]) for n, id in enumerate(player_ids)]
+    )
+    official_ids = ids.allocate(3, officials)
+    conn.executemany(
+        "INSERT INTO officials (id, name, email) VALUES (?, ?, ?)",
+        [(id, f"Official {n}", f"official{n}@example.com") for n, id in enumerate(official_ids)]
+    )
+
+    tournament_ids = ids.allocate(3, tournaments)
+    counters = {id: [0, 0, 0] for id in player_ids}
+    pending = []
+    for n, tournament in enumerate(tournament_ids):
+        conn.execute(
+            "INSERT INTO tournaments (id, name, date, official, location, boards, rounds) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (tournament, f"Tournament {n}", 1640995200 + n * 86400, rng.choice(official_ids), "Hall", boards, rounds)
+        )
+        field = rng.sample(player_ids, min(players, boards * 2))
+        conn.executemany(
+            "INSERT INTO enrollment (id, player_id, tournament_id, team_id) VALUES (?, ?, ?, ?)",
+            [(id, player, tournament, player_team[player]) for id, player in zip(ids.allocate(4, len(field)), field)]
+        )
+
+        games = []
+        for round in range(1, rounds + 1):
+            rng.shuffle(field)
+            pairs = list(zip(field[::2], field[1::2]))
+            for board, (white, black), id in zip(range(boards), pairs, ids.allocate(3, len(pairs))):
+                if round == rounds:
+                    games.append((id, tournament, board, white, black, round, None, None))
+                    pending.append(id)
+                    continue
+                outcome = rng.random()
+                if outcome < .45:
+                    result, winner, loser = str(white), white, black
+                elif outcome < .9:
+                    result, winner, loser = str(black), black, white
+                else:
+                    result, winner, loser = "draw", None, None
+                if winner is None:
+                    counters[white][2] += 1
+                    counters[black][2] += 1
+                else:
+                    counters[winner][0] += 1
+                    counters[loser][1] += 1
+                games.append((id, tournament, board, white, black, round, rng.choice(official_ids), result))
+        conn.executemany(
+            "INSERT INTO games (id, tournament_id, board, white, black, round, official, result) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", games
+        )
+
+    conn.executemany(
+        "UPDATE players SET wins = ?, losses = ?, draws = ? WHERE id = ?",
+        [(*counts, id) for id, counts in counters.items()]
+    )
+    conn.commit()
+    conn.close()
+
+    return {
+        "teams": team_ids,
+        "players": player_ids,
+        "officials": official_ids,
+        "tournaments": tournament_ids,
+        "pending_games": pending,
+    }
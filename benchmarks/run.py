@@ -0,0 +1,164 @@
+"""Drives the app in-process against generated databases and reports
+latency percentiles and throughput per endpoint."""
+import asyncio
+import base64
+import itertools
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiohttp
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.generate import SCALES, generate
+from chess_data_api import create_app
+
+
+# The app's credentials for these runs; it never sees config.json.
+USERNAME, PASSWORD = "bench", "bench"
+
+Scenario = Callable[[TestClient, int], Awaitable[aiohttp.ClientResponse]]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, float]:
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(milliseconds), 3) if milliseconds else None,
+        "p50_ms": round(percentile(milliseconds, .5), 3) if milliseconds else None,
+        "p90_ms": round(percentile(milliseconds, .9), 3) if milliseconds else None,
+        "p99_ms": round(percentile(milliseconds, .99), 3) if milliseconds else None,
+        "max_ms": round(max(milliseconds), 3) if milliseconds else None,
+        "throughput_rps": round(len(latencies) / seconds, 1) if seconds else None,
+    }
+
+
+async def measure(client: TestClient, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker() -> None:
+        nonlocal errors
+        while (n := next(counter)) < requests:
+            started = time.perf_counter()
+            response = await scenario(client, n)
+            await response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def scenarios(data: Dict[str, List[int]], rounds: int, seed: int) -> Dict[str, tuple]:
+    """Each entry is (request function, how many requests it can make)."""
+    rng = random.Random(seed)
+    tournaments, teams, players = data["tournaments"], data["teams"], data["players"]
+    officials, pending = data["officials"], list(data["pending_games"])
+    rng.shuffle(pending)
+    next_round = {id: rounds + 1 for id in tournaments}
+
+    async def get_tournament(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        return await client.get(f"/tournaments/{rng.choice(tournaments)}")
+
+    async def leaderboard(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        return await client.get(f"/teams/{rng.choice(teams)}/leaderboard")
+
+    async def get_player(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        return await client.get(f"/players/{rng.choice(players)}")
+
+    async def resolve(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        return await client.post(
+            f"/games/{pending[n]}/resolve", json={"official": rng.choice(officials), "result": "draw"}
+        )
+
+    async def organize(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        tournament = tournaments[n % len(tournaments)]
+        round, next_round[tournament] = next_round[tournament], next_round[tournament] + 1
+        return await client.post(f"/tournaments/{tournament}/organize/{round}")
+
+    async def enroll_mass(client: TestClient, n: int) -> aiohttp.ClientResponse:
+        field = rng.sample(players, min(50, len(players)))
+        return await client.post(
+            f"/tournaments/{rng.choice(tournaments)}/enroll/mass",
+            json={"list": [{"player": player, "team": teams[0]} for player in field]}
+        )
+
+    return {
+        "GET /tournaments/{id}": (get_tournament, None),
+        "GET /teams/{id}/leaderboard": (leaderboard, None),
+        "GET /players/{id}": (get_player, None),
+        "POST /games/{id}/resolve": (resolve, len(pending)),
+        "POST /tournaments/{id}/organize/{round}": (organize, None),
+        "POST /tournaments/{id}/enroll/mass": (enroll_mass, None),
+    }
+
+
+async def run_scale(name: str, requests: int, concurrency: int, cache: bool, seed: int) -> Dict[str, Any]:
+    scale = SCALES[name]
+    with tempfile.TemporaryDirectory() as scratch:
+        path = Path(scratch) / "bench.sqlite3"
+        started = time.perf_counter()
+        data = generate(path, seed=seed, **scale)
+        generated = time.perf_counter() - started
+
+        app = create_app({"username": USERNAME, "password": PASSWORD, "database": {"path": str(path)}})
+        if not cache:
+            app["CACHE"] = None
+        credentials = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+        async with TestClient(TestServer(app), headers={"Authorization": f"Basic {credentials}"}) as client:
+            for tournament in data["tournaments"]:
+                await client.post(f"/tournaments/{tournament}/standings/rebuild")
+
+            endpoints = {}
+            for endpoint, (scenario, limit) in scenarios(data, scale["rounds"], seed).items():
+                count = min(requests, limit) if limit is not None else requests
+                endpoints[endpoint] = await measure(client, scenario, count, concurrency)
+                print(f"  {endpoint}: p50 {endpoints[endpoint]['p50_ms']} ms, "
+                      f"p99 {endpoints[endpoint]['p99_ms']} ms, {endpoints[endpoint]['throughput_rps']} req/s")
+
+    return {"scale": name, "size": scale, "generate_seconds": round(generated, 3), "endpoints": endpoints}
+
+
+def metadata(args: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "aiohttp": aiohttp.__version__,
+        "options": args,
+    }
+
+
+async def run(scales: List[str], requests: int, concurrency: int, cache: bool, seed: int) -> Dict[str, Any]:
+    results = []
+    for name in scales:
+        print(f"{name}:")
+        results.append(await run_scale(name, requests, concurrency, cache, seed))
+    return {
+        "meta": metadata({"scales": scales, "requests": requests, "concurrency": concurrency, "cache": cache,
+                          "seed": seed}),
+        "results": results,
+    }
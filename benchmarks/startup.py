@@ -0,0 +1,79 @@
+"""Cold start: each sample is a fresh interpreter that imports the package,
+builds the app, starts serving on a free port and answers one /ping, timed
+step by step. Run against an empty database (every migration applied on
+startup) and against an up-to-date one."""
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+# Runs in the child interpreter; prints the step timings as JSON.
+PROBE = """
+import time
+started = time.perf_counter()
+import asyncio, base64, json, sys
+import aiohttp
+from aiohttp import web
+import chess_data_api
+imported = time.perf_counter()
+
+async def main():
+    app = chess_data_api.create_app({"username": "u", "password": "p", "database": {"path": sys.argv[1]}})
+    created = time.perf_counter()
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    serving = time.perf_counter()
+    port = runner.addresses[0][1]
+    headers = {"Authorization": "Basic " + base64.b64encode(b"u:p").decode()}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async with session.get(f"http://127.0.0.1:{port}/ping") as response:
+            assert response.status == 200, response.status
+    answered = time.perf_counter()
+    await runner.cleanup()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "startup_ms": (serving - created) * 1000,
+        "first_request_ms": (answered - serving) * 1000,
+        "ready_ms": (answered - started) * 1000,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def sample(path: Path) -> Dict[str, float]:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, str(path)], capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parent.parent
+    ).stdout
+    timings = json.loads(output)
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in samples[0]}
+
+
+def startup(repeat: int = 5) -> Dict[str, Any]:
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        fresh = []
+        for n in range(repeat):
+            fresh.append(sample(Path(scratch) / f"fresh-{n}.sqlite3"))
+        migrated = [sample(Path(scratch) / "fresh-0.sqlite3") for _ in range(repeat)]
+    results["empty_database"] = summarize(fresh)
+    results["migrated_database"] = summarize(migrated)
+    for name, timings in results.items():
+        print(f"  {name}: ready in {timings['ready_ms']} ms ({timings['process_ms']} ms with the interpreter), "
+              f"import {timings['import_ms']} ms, startup {timings['startup_ms']} ms")
+    return results
@@ -0,0 +1,20 @@
+"""Chess tournament data API.
+
+Importing the package has no side effects: build an app with
+``create_app(config)`` and run it, or start the server with
+``python -m chess_data_api``."""
+from typing import Any
+
+__all__ = ["create_app", "load_config"]
+
+
+def __getattr__(name: str) -> Any:
+    # loaded on first use, so the standalone tools (python -m chess_data_api.ids
+    # and friends) do not import the whole app
+    if name == "create_app":
+        from .app import create_app
+        return create_app
+    if name == "load_config":
+        from .config import load_config
+        return load_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
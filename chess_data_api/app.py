@@ -0,0 +1,1793 @@
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Sequence, Set, Tuple, TypeAlias, Union
+
+import aiosqlite
+from aiohttp import web
+from aiohttp_basicauth import BasicAuthMiddleware
+
+from . import queries
+from .cache import ResponseCache, cached, conditional, invalidate
+from .channel import Channel
+from .compression import Compression, Writer, compression_middleware, prepare
+from .config import with_defaults
+from .database import Database, migrate
+from .export import stream_rows
+from .ids import MAX_ID, IdGenerator
+from .imports import run_import
+from .instrument import instrument_middleware
+from .live import Hub, stream
+from .loaders import BatchFn, Loader, get_loader, loader_middleware
+from .metrics import Metrics, metrics_middleware, probe_readers, exposition
+from .pairing import ENGINES, Entrant, Pairing, build_history
+from .schedule import Schedule, round_robin, team_matches
+from .serialize import Serializer, encode, json_response, serializer_middleware, versioned
+
+
+PlayerT: TypeAlias = Dict[str, Union[str, int]]
+
+# Keeps batched "id IN (...)" lookups well under SQLite's bound parameter limit.
+MAX_BATCH_PARAMS = 500
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Times a round is paired again because a write changed the standings
+# between pairing and committing, before the request gives up with 409.
+ORGANIZE_ATTEMPTS = 3
+
+router = web.RouteTableDef()
+
+
+class CustomAuth(BasicAuthMiddleware):
+    async def check_credentials(self, username, password, request):
+        config = request.config_dict['CONFIG']
+        return username == config['username'] and password == config['password']
+
+
+custom_auth = CustomAuth()
+
+
+class NotFoundException(BaseException):
+    pass
+
+
+def generate_id(request: web.Request, type: int) -> int:
+    return request.config_dict['IDS'].next(type)
+
+
+def generate_ids(request: web.Request, type: int, count: int) -> List[int]:
+    return request.config_dict['IDS'].allocate(type, count)
+
+
+def not_found(kind: str) -> Callable[[int], NotFoundException]:
+    return lambda id: NotFoundException(f"{kind} {id} does not exist!")
+
+
+async def load_entity(db: aiosqlite.Connection, batch_fn: BatchFn, kind: str, id: int):
+    """Loads one row through the request's batching loader, or directly outside of a request."""
+    missing = not_found(kind)
+    loader = get_loader(db, batch_fn, missing) or Loader(db, batch_fn, missing)
+    return await loader.load(id)
+
+
+async def load_entities(db: aiosqlite.Connection, batch_fn: BatchFn, kind: str, ids: Iterable[int]) -> Dict[int, Any]:
+    missing = not_found(kind)
+    loader = get_loader(db, batch_fn, missing) or Loader(db, batch_fn, missing)
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    return dict(zip(ids, await loader.load_many(ids)))
+
+
+async def fetch_team_members(db: aiosqlite.Connection, id: int) -> List[PlayerT]:
+    async with db.execute(
+            queries.TEAM_MEMBERS, [id]
+    ) as cursor:
+        rows = await cursor.fetchall()
+        members = prime_players_light(db, rows)
+
+        members.sort(key=lambda s: s['name'].split()[-1])
+
+        return members
+
+
+async def fetch_team_leaderboard(db: aiosqlite.Connection, id: int) -> List[PlayerT]:
+    async with db.execute(
+            queries.TEAM_MEMBERS, [id]
+    ) as cursor:
+        rows = await cursor.fetchall()
+        members = prime_players_light(db, rows)
+
+        members.sort(reverse=True, key=lambda s: (s['wins'] + .5 * s['draws']) - (s['losses'] + .5 * s['draws']))
+
+        return members
+
+
+async def fetch_team(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, List[List[PlayerT]]]]:
+    async with db.execute(
+            queries.TEAM, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        if not row:
+            raise NotFoundException(f"Team {id} does not exist!")
+
+        return {
+            "id": id,
+            "type": "team",
+            "name": row["name"],
+            "sponsor": row["sponsor_name"],
+            "members": [await fetch_team_members(db, id)]
+        }
+
+
+def team_light_from_row(row: aiosqlite.Row) -> Dict[str, Union[str, int, None]]:
+    return versioned("team", row, {
+        "id": row["id"],
+        "type": "team",
+        "name": row["name"],
+        "sponsor": row["sponsor_name"],
+        "members": None
+    })
+
+
+async def fetch_teams_light(db: aiosqlite.Connection, ids: Iterable[int]) -> Dict[int, Dict[str, Union[str, int, None]]]:
+    return {row["id"]: team_light_from_row(row) for row in await fetch_rows_by_ids(db, "teams", ids)}
+
+
+async def fetch_player(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, Dict[str, str | int | List[List[PlayerT]]]]]:
+    async with db.execute(
+            queries.PLAYER, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        if not row:
+            raise NotFoundException(f"Player {id} does not exist!")
+
+        return {
+            "id": row["id"],
+            "type": "player",
+            "name": row["name"],
+            "grade": int(row["grade"]),
+            "wins": row["wins"],
+            "losses": row["losses"],
+            "draws": row["draws"],
+            "team": await fetch_team(db, row["team"])
+        }
+
+
+def player_light_from_row(row: aiosqlite.Row) -> PlayerT:
+    return versioned("player", row, {
+        "id": row["id"],
+        "type": "player",
+        "name": row["name"],
+        "grade": int(row["grade"]),
+        "wins": row["wins"],
+        "draws": row["draws"],
+        "losses": row["losses"],
+        "team": row['team']
+    })
+
+
+async def fetch_player_light(db: aiosqlite.Connection, id: int) -> PlayerT:
+    return await load_entity(db, fetch_players_light, "Player", id)
+
+
+async def fetch_rows_by_ids(db: aiosqlite.Connection, table: str, ids: Iterable[int]) -> List[aiosqlite.Row]:
+    ids = list(dict.fromkeys(int(i) for i in ids if i is not None))
+    rows = []
+
+    for start in range(0, len(ids), MAX_BATCH_PARAMS):
+        chunk = ids[start:start + MAX_BATCH_PARAMS]
+        async with db.execute(queries.rows_by_ids(table, len(chunk)), chunk) as cursor:
+            rows.extend(await cursor.fetchall())
+
+    return rows
+
+
+def page_query(request: web.Request, filters: Dict[str, str]) -> Dict[str, Any]:
+    """Reads ``limit``, ``after`` (the last id of the previous page) and the
+    given ``{query parameter: column}`` filters from the query string."""
+    query = request.query
+    return {
+        "limit": min(max(int(query.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE),
+        "after": int(query["after"]) if "after" in query else None,
+        "filters": {column: int(query[name]) for name, column in filters.items() if name in query}
+    }
+
+
+async def fetch_page(db: aiosqlite.Connection, table: str, limit: int, after: int | None,
+                     filters: Dict[str, Any], conditions: Iterable[str] = ()) -> List[aiosqlite.Row]:
+    """One page of ``table`` in id order, starting after ``after``. Walks an
+    index from the cursor instead of skipping rows, so every page costs the
+    same. Returns up to ``limit + 1`` rows; the extra one means there is a
+    next page."""
+    params = [*filters.values(), *([after] if after is not None else []), limit + 1]
+    async with db.execute(queries.page(table, filters, conditions, after is not None), params) as cursor:
+        return await cursor.fetchall()
+
+
+def page(items: List[Any], rows: List[aiosqlite.Row], limit: int) -> Dict[str, Any]:
+    return {
+        "type": "page",
+        "items": items[:limit],
+        "next": rows[limit - 1]["id"] if len(rows) > limit else None
+    }
+
+
+async def fetch_players_light(db: aiosqlite.Connection, ids: Iterable[int]) -> Dict[int, PlayerT]:
+    return {row["id"]: player_light_from_row(row) for row in await fetch_rows_by_ids(db, "players", ids)}
+
+
+def prime_players_light(db: aiosqlite.Connection, rows: List[aiosqlite.Row]) -> List[PlayerT]:
+    players = [player_light_from_row(row) for row in rows]
+    loader = get_loader(db, fetch_players_light, not_found("Player"))
+
+    if loader is not None:
+        for player in players:
+            loader.prime(player["id"], player)
+
+    return players
+
+
+def standings_from_row(row: aiosqlite.Row | None, id: int, tournament_id: int) -> PlayerT:
+    return {
+        "id": id,
+        "type": "player-tournament_standings",
+        "tournament": tournament_id,
+        "wins": row["wins"] if row else 0,
+        "losses": row["losses"] if row else 0,
+        "draws": row["draws"] if row else 0,
+        "byes": row["byes"] if row else 0,
+        "score": row["score"] if row else 0
+    }
+
+
+async def fetch_player_standings(db: aiosqlite.Connection, id: int, tournament_id: int) -> PlayerT:
+    async with db.execute(
+            queries.PLAYER_STANDINGS, [tournament_id, id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        return standings_from_row(row, id, tournament_id)
+
+
+async def fetch_tournament_standings(db: aiosqlite.Connection, tournament_id: int) -> List[PlayerT]:
+    async with db.execute(
+            queries.TOURNAMENT_STANDINGS, [tournament_id]
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+        return [standings_from_row(row, row["player_id"], row["tournament_id"]) for row in rows]
+
+
+async def fetch_standings_of(db: aiosqlite.Connection, tournament_id: int, ids: Iterable[int]) -> List[PlayerT]:
+    ids = list(dict.fromkeys(ids))
+    async with db.execute(
+            queries.standings_of(len(ids)), [tournament_id, *ids]
+    ) as cursor:
+        rows = {row["player_id"]: row for row in await cursor.fetchall()}
+
+    return [standings_from_row(rows.get(id), id, tournament_id) for id in ids]
+
+
+async def fetch_enrolled_standings(db: aiosqlite.Connection, tournament_id: int) -> List[PlayerT]:
+    async with db.execute(
+            queries.ENROLLED_STANDINGS, [tournament_id]
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+        return [
+            standings_from_row(row if row["score"] is not None else None, row["player_id"], tournament_id)
+            for row in rows
+        ]
+
+
+async def record_standings(db: aiosqlite.Connection, tournament_id: int, wins: Iterable[int] = (),
+                           losses: Iterable[int] = (), draws: Iterable[int] = (), byes: Iterable[int] = ()) -> None:
+    """Adds results to the tournament's standings rows. Runs inside the caller's
+    transaction, next to the game update it belongs to."""
+    rows = [[tournament_id, id, 1, 0, 0, 0, 1] for id in wins]
+    rows += [[tournament_id, id, 0, 1, 0, 0, 0] for id in losses]
+    rows += [[tournament_id, id, 0, 0, 1, 0, .5] for id in draws]
+    rows += [[tournament_id, id, 0, 0, 0, 1, 1] for id in byes]
+    await db.executemany(
+        """INSERT INTO tournament_standings (tournament_id, player_id, wins, losses, draws, byes, score)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (tournament_id, player_id) DO UPDATE SET
+            wins = wins + excluded.wins,
+            losses = losses + excluded.losses,
+            draws = draws + excluded.draws,
+            byes = byes + excluded.byes,
+            score = score + excluded.score""", rows
+    )
+
+
+async def rebuild_standings(db: aiosqlite.Connection, tournament_id: int | None = None) -> None:
+    """Recomputes standings from the games table, for one tournament or all of
+    them. Byes are not recorded as games, so the bye counts are kept."""
+    # A plain "tournament_id = ?" (rather than "? IS NULL OR ...") lets the
+    # single-tournament rebuild run off the tournament indexes.
+    scope = "tournament_id = :tournament_id" if tournament_id is not None else "true"
+    params = {"tournament_id": tournament_id}
+    for sql in queries.rebuild_standings(scope):
+        await db.execute(sql, params)
+
+
+def official_from_row(row: aiosqlite.Row) -> PlayerT:
+    return versioned("official", row, {
+        "id": row["id"],
+        "type": "official",
+        "name": row["name"],
+        "email": row["email"],
+        "verified": row["verified"]
+    })
+
+
+async def fetch_official(db: aiosqlite.Connection, id: int) -> PlayerT:
+    return await load_entity(db, fetch_officials, "Official", id)
+
+
+async def fetch_officials(db: aiosqlite.Connection, ids: Iterable[int]) -> Dict[int, PlayerT]:
+    return {row["id"]: official_from_row(row) for row in await fetch_rows_by_ids(db, "officials", ids)}
+
+
+async def fetch_official_or_none(db: aiosqlite.Connection, id: int | None) -> PlayerT | None:
+    if id is None:
+        return None
+    return await fetch_official(db, id)
+
+
+async def fetch_tournament_row(db: aiosqlite.Connection, id: int) -> aiosqlite.Row:
+    async with db.execute(
+            queries.TOURNAMENT, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        if not row:
+            raise NotFoundException(f"Tournament {id} does not exist!")
+
+    return row
+
+
+def tournament_from_row(row: aiosqlite.Row, official: PlayerT, rounds: Dict[str, List[Dict[str, Any]]]) \
+        -> Dict[str, Union[str, int, PlayerT, List[Dict[str, str]]]]:
+    return {
+        "id": row["id"],
+        "type": "tournament",
+        "name": row["name"],
+        "date": row["date"],
+        "boards": row['boards'],
+        "rounds": row['rounds'],
+        "location": row["location"],
+        "official": official,
+        "games": rounds
+    }
+
+
+async def fetch_tournament(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, PlayerT, List[Dict[str, str]]]]:
+    row = await fetch_tournament_row(db, id)
+
+    # Load every game of the event and everyone they reference in a fixed
+    # number of queries, then build the per-round lists in memory.
+    async with db.execute(
+            queries.TOURNAMENT_GAMES, [id]
+    ) as cursor:
+        game_rows = await cursor.fetchall()
+
+    rounds = {f"{c + 1}": [] for c in range(row['rounds'])}
+
+    for game in await fetch_games_light_from_rows(db, game_rows):
+        games = rounds.get(str(game['round']))
+        if games is not None:
+            games.append(game)
+
+    return tournament_from_row(row, await fetch_official(db, row["official"]), rounds)
+
+
+async def stream_tournament(request: web.Request, id: int) -> web.StreamResponse:
+    """Sends the document fetch_tournament builds one round at a time, so
+    only one round of games is held in memory. Read from a snapshot so the
+    rounds are consistent with each other; not kept in the response cache."""
+    async with request.config_dict['DB'].snapshot() as db:
+        row = await fetch_tournament_row(db, id)
+        head = encode(tournament_from_row(row, await fetch_official(db, row["official"]), {}))
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        if "ETAG" in request:
+            response.headers["ETag"] = request["ETAG"]
+        writer = Writer(request, response, await prepare(request, response))
+        # the head ends with the empty games object and the document's
+        # closing brace; reopen the games object and add a round at a time
+        await writer.write(head[:-2])
+        for c in range(row['rounds']):
+            games = await fetch_games_by_rounds(db, id, c + 1)
+            entry = encode({f"{c + 1}": games})[1:-1]
+            await writer.write(entry if c == 0 else b"," + entry)
+        await writer.write(b"}}")
+        await writer.close()
+
+    return response
+
+
+def tournament_light_from_row(row: aiosqlite.Row) -> Dict[str, Union[str, int, None]]:
+    return versioned("tournament", row, {
+        "id": row["id"],
+        "type": "tournament",
+        "name": row["name"],
+        "date": row["date"],
+        "boards": row['boards'],
+        "rounds": row['rounds'],
+        "location": row["location"],
+        "official": row["official"],
+        "games": None
+    })
+
+
+async def fetch_tournaments_light(db: aiosqlite.Connection, ids: Iterable[int]) \
+        -> Dict[int, Dict[str, Union[str, int, None]]]:
+    return {row["id"]: tournament_light_from_row(row) for row in await fetch_rows_by_ids(db, "tournaments", ids)}
+
+
+async def fetch_tournament_light(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, None]]:
+    return await load_entity(db, fetch_tournaments_light, "Tournament", id)
+
+
+async def fetch_tournaments(db: aiosqlite.Connection, ids: Iterable[int]) \
+        -> Dict[int, Dict[str, Union[str, int, PlayerT, List[Dict[str, str]]]]]:
+    tournaments = {}
+
+    for id in ids:
+        try:
+            tournaments[id] = await fetch_tournament(db, id)
+        except NotFoundException:
+            pass
+
+    return tournaments
+
+
+async def fetch_game(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, Dict[str, Union[str, int, None]], PlayerT]]:
+    async with db.execute(
+            queries.GAME, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        if not row:
+            raise NotFoundException(f"game {id} does not exist!")
+
+        tournament, white, black, official_obj = await asyncio.gather(
+            fetch_tournament_light(db, row['tournament_id']),
+            fetch_player_light(db, row['white']),
+            fetch_player_light(db, row['black']),
+            fetch_official_or_none(db, row['official'])
+        )
+
+        return {
+            "id": row["id"],
+            "type": "game",
+            "board": row['board'],
+            "round": row['round'],
+            "tournament": tournament,
+            "white": white,
+            "black": black,
+            "official": official_obj,
+            "result": row['result']
+        }
+
+
+def lookup(loaded: Dict[int, PlayerT], id: int, kind: str) -> PlayerT:
+    try:
+        return loaded[id]
+    except KeyError:
+        raise NotFoundException(f"{kind} {id} does not exist!")
+
+
+def game_light_from_row(row: aiosqlite.Row, players: Dict[int, PlayerT], officials: Dict[int, PlayerT]) \
+        -> Dict[str, Union[str, int, PlayerT]]:
+    if row['official'] is None:
+        official_obj = None
+    else:
+        official_obj = lookup(officials, row['official'], "Official")
+    white = lookup(players, row['white'], "Player")
+    black = lookup(players, row['black'], "Player")
+
+    return versioned("game", row, {
+        "id": row["id"],
+        "type": "game",
+        "board": row['board'],
+        "round": row['round'],
+        "tournament": row['tournament_id'],
+        "white": white,
+        "black": black,
+        "official": official_obj,
+        "result": row['result']
+    }, white, black, official_obj)
+
+
+async def fetch_games_light_from_rows(db: aiosqlite.Connection, rows: List[aiosqlite.Row]) \
+        -> List[Dict[str, Union[str, int, PlayerT]]]:
+    players, officials = await asyncio.gather(
+        load_entities(db, fetch_players_light, "Player", [row['white'] for row in rows] + [row['black'] for row in rows]),
+        load_entities(db, fetch_officials, "Official", [row['official'] for row in rows if row['official'] is not None])
+    )
+
+    return [game_light_from_row(row, players, officials) for row in rows]
+
+
+async def fetch_player_games_page(db: aiosqlite.Connection, id: int, limit: int, after: int | None,
+                                  filters: Dict[str, Any]) -> List[aiosqlite.Row]:
+    params = [*filters.values(), *([after] if after is not None else []), limit + 1]
+    async with db.execute(
+            queries.player_games_page(filters, after is not None), [id, *params, id, *params, limit + 1]
+    ) as cursor:
+        return await cursor.fetchall()
+
+
+async def fetch_ids(db: aiosqlite.Connection, table: str) -> Set[int]:
+    async with db.execute(f"SELECT id FROM {table}") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+async def fetch_tournament_history(db: aiosqlite.Connection, tournament_id: int) -> List[aiosqlite.Row]:
+    async with db.execute(
+            queries.PAIRING_HISTORY, [tournament_id]
+    ) as cursor:
+        return await cursor.fetchall()
+
+
+async def fetch_enrolled_players(db: aiosqlite.Connection, tournament_id: int) -> List[int]:
+    async with db.execute(
+            queries.ENROLLED_PLAYERS, [tournament_id]
+    ) as cursor:
+        return [row['player_id'] for row in await cursor.fetchall()]
+
+
+async def fetch_lineups(db: aiosqlite.Connection, tournament_id: int) -> Dict[int, List[int]]:
+    """Enrolled players by team, strongest (highest grade) first."""
+    async with db.execute(
+            queries.LINEUPS, [tournament_id]
+    ) as cursor:
+        lineups = {}
+        for row in await cursor.fetchall():
+            lineups.setdefault(row['team_id'], []).append(row['player_id'])
+        return lineups
+
+
+async def check_ids(db: aiosqlite.Connection, table: str, kind: str, ids: Iterable[Any]) -> List[int]:
+    """Returns ``ids`` as ints, raising ValueError unless each one names a
+    distinct existing row (foreign keys are not enforced by the database)."""
+    try:
+        ids = [int(id) for id in ids]
+    except (TypeError, ValueError):
+        raise ValueError(f"{kind} ids must be integers!")
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{kind} ids must not repeat!")
+    found = {row["id"] for row in await fetch_rows_by_ids(db, table, ids)}
+    missing = [str(id) for id in ids if id not in found]
+    if missing:
+        raise ValueError(f"{kind} {', '.join(missing)} does not exist!")
+    return ids
+
+
+async def create_scheduled_games(db: aiosqlite.Connection, id_generator: IdGenerator, tournament_id: int,
+                                 schedule: Schedule, start_round: int) -> None:
+    ids = iter(id_generator.allocate(3, schedule.games))
+    await db.executemany(
+        "INSERT INTO games (id, board, white, black, round, tournament_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            [next(ids), board, white, black, start_round + index, tournament_id]
+            for index, games in enumerate(schedule.rounds)
+            for board, white, black in games
+        ]
+    )
+    await db.execute(
+        "UPDATE tournaments SET rounds = MAX(rounds, ?), boards = MAX(boards, ?) WHERE id = ?",
+        [start_round - 1 + len(schedule.rounds), schedule.boards, tournament_id]
+    )
+
+
+async def fetch_game_tournament_id(db: aiosqlite.Connection, id: int) -> int | None:
+    async with db.execute(
+            queries.GAME_TOURNAMENT, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        return row['tournament_id'] if row else None
+
+
+async def fetch_enrollment(db: aiosqlite.Connection, id: int) -> Dict[str, Union[str, int, PlayerT, Dict[str, str | int | PlayerT | List[Dict[str, str]]], Dict[str, str | int | None]]]:
+    async with db.execute(
+            queries.ENROLLMENT, [id]
+    ) as cursor:
+        row = await cursor.fetchone()
+
+        if not row:
+            raise NotFoundException(f"enrollment card {id} does not exist!")
+
+        return (await fetch_enrollments_from_rows(db, [row]))[0]
+
+
+async def fetch_enrollments(db: aiosqlite.Connection, ids: List[int]) -> List[Dict[str, Union[str, int, PlayerT]]]:
+    rows = {row['id']: row for row in await fetch_rows_by_ids(db, "enrollment", ids)}
+    return await fetch_enrollments_from_rows(db, [lookup(rows, int(id), "enrollment card") for id in ids])
+
+
+async def fetch_enrollments_from_rows(db: aiosqlite.Connection, rows: List[aiosqlite.Row]) \
+        -> List[Dict[str, Union[str, int, PlayerT]]]:
+    players, tournaments, teams = await asyncio.gather(
+        load_entities(db, fetch_players_light, "Player", [row['player_id'] for row in rows]),
+        load_entities(db, fetch_tournaments, "Tournament", [row['tournament_id'] for row in rows]),
+        load_entities(db, fetch_teams_light, "Team", [row['team_id'] for row in rows])
+    )
+
+    return [
+        {
+            "id": row['id'],
+            "type": "enrollment",
+            "player": players[row['player_id']],
+            "tournament": tournaments[row['tournament_id']],
+            "team": teams[row['team_id']]
+        }
+        for row in rows
+    ]
+
+
+async def fetch_games_by_rounds(db: aiosqlite.Connection, id: int, round: int) -> List[Dict[str, Dict[str, str | int | PlayerT]]]:
+    async with db.execute(
+            queries.ROUND_GAMES, [id, round]
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+    return await fetch_games_light_from_rows(db, rows)
+
+
+async def add_results(db: aiosqlite.Connection, wins: Iterable[int] = (), losses: Iterable[int] = (),
+                      draws: Iterable[int] = ()) -> Dict[int, Dict[str, int]]:
+    """Adds to the players' overall counters in place (``wins = wins + n``), so
+    concurrent results never overwrite each other. A player listed several
+    times gets all of them. Returns the updated counters by player id."""
+    deltas: Dict[int, List[int]] = {}
+    for column, ids in enumerate((wins, losses, draws)):
+        for id in ids:
+            deltas.setdefault(int(id), [0, 0, 0])[column] += 1
+
+    rows = [[id, *delta] for id, delta in deltas.items()]
+    updated = {}
+    for i in range(0, len(rows), MAX_BATCH_PARAMS // 4):
+        chunk = rows[i:i + MAX_BATCH_PARAMS // 4]
+        async with db.execute(
+                f"""WITH deltas (id, wins, losses, draws) AS (VALUES {", ".join(["(?, ?, ?, ?)"] * len(chunk))})
+                UPDATE players SET
+                    wins = players.wins + deltas.wins,
+                    losses = players.losses + deltas.losses,
+                    draws = players.draws + deltas.draws
+                FROM deltas WHERE players.id = deltas.id
+                RETURNING id, wins, losses, draws""", [value for row in chunk for value in row]
+        ) as cursor:
+            for row in await cursor.fetchall():
+                updated[row['id']] = dict(row)
+
+    return updated
+
+
+async def add_win(db: aiosqlite.Connection, id: int) -> Dict[str, int]:
+    return (await add_results(db, wins=[id]))[int(id)]
+
+
+async def setup_game(db: aiosqlite.Connection, id_generator: IdGenerator, white: int, black: int, board: int,
+                     round: int, tournament: int) -> Dict[str, Union[int, Dict[str, str | int | None], PlayerT, None]]:
+    id = id_generator.next(3)
+    await db.execute(
+        "INSERT INTO games (id, board, white, black, round, tournament_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [id, board, white, black, round, tournament]
+    )
+
+    tournament_obj, white_obj, black_obj = await asyncio.gather(
+        fetch_tournament_light(db, tournament),
+        fetch_player_light(db, white),
+        fetch_player_light(db, black)
+    )
+
+    return {
+        "id": id,
+        "tournament": tournament_obj,
+        "board": board,
+        "round": round,
+        "white": white_obj,
+        "black": black_obj,
+        "official": None,
+        "result": None
+    }
+
+
+# Versions of everything a document embeds, for its ETag. Each row version
+# only goes up. A sum over child rows is only monotonic while the set of
+# rows it covers stays the same, so anything that changes that set (adding,
+# removing or re-pointing a game, member or enrollment) bumps the parent's
+# own version, which comes first in the tuple.
+async def fetch_versions(db: aiosqlite.Connection, sql: str, id: str) -> Sequence[int] | None:
+    async with db.execute(sql, [id]) as cursor:
+        return await cursor.fetchone()
+
+
+async def tournament_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.TOURNAMENT_VERSIONS, id)
+
+
+async def standings_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.STANDINGS_VERSIONS, id)
+
+
+async def game_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.GAME_VERSIONS, id)
+
+
+async def team_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.TEAM_VERSIONS, id)
+
+
+async def player_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.PLAYER_VERSIONS, id)
+
+
+async def official_versions(db: aiosqlite.Connection, id: str) -> Sequence[int] | None:
+    return await fetch_versions(db, queries.OFFICIAL_VERSIONS, id)
+
+
+def watched(request: web.Request, tournament_id: int | str | None) -> bool:
+    if tournament_id is None:
+        return False
+    channel: Channel | None = request.config_dict.get("CHANNEL")
+    return request.config_dict['LIVE'].watched(int(tournament_id)) or (
+        channel is not None and channel.watched(int(tournament_id))
+    )
+
+
+def publish(request: web.Request, tournament_id: int | str, event: str, data: Any) -> None:
+    """Pushes an event to the tournament's live viewers, in this worker and
+    the others. Call it once the write has committed."""
+    tournament_id = int(tournament_id)
+    request.config_dict['LIVE'].publish(tournament_id, event, data)
+    channel: Channel | None = request.config_dict.get("CHANNEL")
+    if channel is not None and channel.watched(tournament_id):
+        workers = list(channel.remote[tournament_id])
+        if not channel.send("publish", [tournament_id, event, data], to=workers):
+            # too big for a datagram: their viewers reconnect and re-fetch instead
+            channel.send("disconnect", tournament_id, to=workers)
+
+
+def handle_json_error(
+        func: Callable[[web.Request], Awaitable[web.Response]]
+) -> Callable[[web.Request], Awaitable[web.Response]]:
+    async def handler(request: web.Request) -> web.Response:
+        try:
+            return await func(request)
+        except asyncio.CancelledError:
+            raise
+        except NotFoundException as ex:
+            return json_response(
+                {"status": str(ex)}, status=404
+            )
+        except Exception as ex:
+            return json_response(
+                {"status": "failed", "reason": str(ex)}, status=400
+            )
+
+    return handler
+
+
+# Game Queries
+@router.post("/games")
+@handle_json_error
+async def create_game(request: web.Request) -> web.Response:
+    info = await request.json()
+    tournament = info['tournament']
+    white = info['white']
+    black = info['black']
+    board = info['board']
+    round = info['round']
+    async with request.config_dict['DB'].transaction() as db:
+        game = await setup_game(db, request.config_dict['IDS'], white, black, board, round, tournament)
+    invalidate(request, ("tournament", tournament))
+    return json_response(game)
+
+
+@router.get("/games")
+@handle_json_error
+async def list_games(request: web.Request) -> web.Response:
+    query = page_query(request, {"tournament": "tournament_id", "round": "round", "official": "official"})
+    conditions = []
+    if "resolved" in request.query:
+        conditions.append("result IS NOT NULL" if request.query["resolved"] == "true" else "result IS NULL")
+    db = request.config_dict['DB'].reader()
+    rows = await fetch_page(db, "games", query["limit"], query["after"], query["filters"], conditions)
+    return json_response(page(await fetch_games_light_from_rows(db, rows[:query["limit"]]), rows, query["limit"]))
+
+
+@router.get("/games/{id}")
+@handle_json_error
+@conditional(game_versions)
+@cached("game")
+async def get_game(request: web.Request) -> web.Response:
+    game_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    game = await fetch_game(db, game_id)
+    return json_response(game)
+
+
+@router.patch("/games/{id}")
+@handle_json_error
+async def edit_game(request: web.Request) -> web.Response:
+    game_id = request.match_info['id']
+    game = await request.json()
+    database = request.config_dict['DB']
+    fields = {}
+    if "white" in game:
+        fields["white"] = game["white"]
+    if "black" in game:
+        fields["black"] = game["black"]
+    if "official" in game:
+        fields["official"] = game["official"]
+    if "result" in game:
+        fields['result'] = game['result']
+    if "board" in game:
+        fields["board"] = game["board"]
+    if fields:
+        field_names = ", ".join(f"{name} = ?" for name in fields)
+        field_values = list(fields.values())
+        async with database.transaction() as db:
+            await db.execute(
+                f"UPDATE games SET {field_names} WHERE id = ?", field_values + [game_id]
+            )
+            tournament_id = await fetch_game_tournament_id(db, game_id)
+            if fields.keys() & {"white", "black", "result"}:
+                await rebuild_standings(db, tournament_id)
+        invalidate(request, ("game", game_id), ("tournament", tournament_id))
+    new_game = await fetch_game(database.reader(), game_id)
+    if fields and watched(request, new_game['tournament']['id']):
+        update = {"game": new_game['id'], "round": new_game['round'], "board": new_game['board'], **fields}
+        if fields.keys() & {"white", "black", "result"}:
+            update["standings"] = await fetch_tournament_standings(database.reader(), new_game['tournament']['id'])
+        publish(request, new_game['tournament']['id'], "game", update)
+    return json_response(new_game)
+
+
+@router.post("/games/{id}/resolve")
+@handle_json_error
+async def resolve_game(request: web.Request) -> web.Response:
+    game_id = request.match_info['id']
+    info = await request.json()
+    database = request.config_dict['DB']
+    async with database.transaction() as db:
+        async with db.execute(
+                "SELECT tournament_id, white, black, official, result FROM games WHERE id = ?", [game_id]
+        ) as cursor:
+            game = await cursor.fetchone()
+        if game is None:
+            raise not_found("Game")(game_id)
+        if game['result'] is not None or game['official'] is not None:
+            return json_response({"status": "game already resolved!"}, status=409)
+        result = info['result']
+        await db.execute(
+            "UPDATE games SET official = ?, result = ? WHERE id = ?", [info['official'], result, game_id]
+        )
+        if result:
+            white, black = game['white'], game['black']
+            outcome = {}
+            if result == white:
+                outcome = {"wins": [white], "losses": [black]}
+            if result == black:
+                outcome = {"wins": [black], "losses": [white]}
+            if result == "draw":
+                outcome = {"draws": [white, black]}
+            await add_results(db, **outcome)
+            await record_standings(db, game['tournament_id'], **outcome)
+    invalidate(
+        request, ("game", game_id), ("tournament", game['tournament_id']),
+        ("player", game['white']), ("player", game['black'])
+    )
+    new_game = await fetch_game(database.reader(), game_id)
+    if watched(request, game['tournament_id']):
+        publish(request, game['tournament_id'], "result", {
+            "game": new_game['id'],
+            "round": new_game['round'],
+            "board": new_game['board'],
+            "result": new_game['result'],
+            "standings": await fetch_standings_of(
+                database.reader(), game['tournament_id'], [game['white'], game['black']]
+            )
+        })
+    return json_response(new_game)
+
+
+@router.delete("/games/{id}")
+@handle_json_error
+async def delete_game(request: web.Request) -> web.Response:
+    game_id = request.match_info['id']
+    async with request.config_dict['DB'].transaction() as db:
+        tournament_id = await fetch_game_tournament_id(db, game_id)
+        async with db.execute(queries.DELETE_GAME, [game_id]) as cursor:
+            if cursor.rowcount == 0:
+                return json_response({
+                    "status": f"Game {game_id} was not found"
+                }, status=404
+                )
+        await rebuild_standings(db, tournament_id)
+    invalidate(request, ("game", game_id), ("tournament", tournament_id))
+    if watched(request, tournament_id):
+        publish(request, tournament_id, "game-deleted", {
+            "game": int(game_id),
+            "standings": await fetch_tournament_standings(request.config_dict['DB'].reader(), tournament_id)
+        })
+    return json_response({"status": "ok", "id": game_id})
+
+
+# Tournament Queries
+@router.post("/tournaments")
+@handle_json_error
+async def create_tournament(request: web.Request) -> web.Response:
+    info = await request.json()
+    id = generate_id(request, 3)
+    name = info['name']
+    date = info['date']
+    official = info['official']
+    location = info['location']
+    boards = info['boards']
+    rounds = info['rounds']
+    database = request.config_dict['DB']
+    official_obj = await fetch_official(database.reader(), official)
+    async with database.transaction() as db:
+        await db.execute(
+            "INSERT INTO tournaments (id, name, date, official, location, boards, rounds) VALUES(?, ?, ?, ?, ?, ?, ?)",
+            [id, name, date, official, location, boards, rounds]
+        )
+    return json_response(
+        {
+            "id": id,
+            "type": "tournament",
+            "name": name,
+            "date": date,
+            "rounds": rounds,
+            "boards": boards,
+            "location": location,
+            "official": official_obj
+        }
+    )
+
+
+@router.get("/tournaments")
+@handle_json_error
+async def list_tournaments(request: web.Request) -> web.Response:
+    query = page_query(request, {"official": "official"})
+    db = request.config_dict['DB'].reader()
+    rows = await fetch_page(db, "tournaments", query["limit"], query["after"], query["filters"])
+    return json_response(page([tournament_light_from_row(row) for row in rows], rows, query["limit"]))
+
+
+@router.get("/tournaments/{id}/enrollments")
+@handle_json_error
+async def list_enrollments(request: web.Request) -> web.Response:
+    query = page_query(request, {"team": "team_id", "player": "player_id"})
+    db = request.config_dict['DB'].reader()
+    tournament = await fetch_tournament_light(db, request.match_info['id'])
+    filters = {"tournament_id": tournament['id'], **query["filters"]}
+    rows = await fetch_page(db, "enrollment", query["limit"], query["after"], filters)
+    return json_response(page(await fetch_enrollments_from_rows(db, rows[:query["limit"]]), rows, query["limit"]))
+
+
+@router.get("/tournaments/{id}")
+@handle_json_error
+@conditional(tournament_versions)
+async def get_tournaments(request: web.Request) -> web.StreamResponse:
+    if request.query.get("stream") == "rounds":
+        return await stream_tournament(request, request.match_info['id'])
+    return await get_tournament_document(request)
+
+
+@cached("tournament")
+async def get_tournament_document(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    tournament = await fetch_tournament(db, tournament_id)
+    return json_response(tournament)
+
+
+@router.get("/tournaments/{id}/standings/{player_id}")
+@handle_json_error
+@conditional(standings_versions)
+@cached("tournament")
+async def get_player_standings_t(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    player_id = request.match_info['player_id']
+    db = request.config_dict['DB'].reader()
+    results = await fetch_player_standings(db, player_id, tournament_id)
+    return json_response(results)
+
+
+@router.get("/tournaments/{id}/standings")
+@handle_json_error
+@conditional(standings_versions)
+@cached("tournament")
+async def get_tournament_standings(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    standings = await fetch_tournament_standings(db, tournament_id)
+    return json_response(standings)
+
+
+@router.get("/tournaments/{id}/live")
+@handle_json_error
+async def live_tournament(request: web.Request) -> web.StreamResponse:
+    """Server-sent events for a tournament: "round" when one is organized,
+    "result"/"results" as games are resolved (with the affected players'
+    standings), "game"/"game-deleted" for corrections and "schedule" when
+    fixtures are generated. The stream opens with the current standings."""
+    tournament_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    tournament = await fetch_tournament_light(db, tournament_id)
+    hello = {"tournament": tournament, "standings": await fetch_tournament_standings(db, tournament['id'])}
+    return await stream(request, request.config_dict['LIVE'], tournament['id'], hello)
+
+
+@router.post("/tournaments/{id}/standings/rebuild")
+@handle_json_error
+async def rebuild_tournament_standings(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    database = request.config_dict['DB']
+    async with database.transaction() as db:
+        await rebuild_standings(db, tournament_id)
+    invalidate(request, ("tournament", tournament_id))
+    standings = await fetch_tournament_standings(database.reader(), tournament_id)
+    return json_response(standings)
+
+
+@router.patch("/tournaments/{id}")
+@handle_json_error
+async def edit_tournaments(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    tournament = await request.json()
+    database = request.config_dict['DB']
+    fields = {}
+    if "name" in tournament:
+        fields["name"] = tournament["name"]
+    if "date" in tournament:
+        fields["date"] = tournament["date"]
+    if "official" in tournament:
+        fields["official"] = tournament["official"]
+    if "location" in tournament:
+        fields['location'] = tournament['location']
+    if "rounds" in tournament:
+        fields['rounds'] = tournament['rounds']
+    if "boards" in tournament:
+        fields['boards'] = tournament['boards']
+    if fields:
+        field_names = ", ".join(f"{name} = ?" for name in fields)
+        field_values = list(fields.values())
+        async with database.transaction() as db:
+            await db.execute(
+                f"UPDATE tournaments SET {field_names} WHERE id = ?", field_values + [tournament_id]
+            )
+        invalidate(request, ("tournament", tournament_id))
+    new_tournament = await fetch_tournament(database.reader(), tournament_id)
+    return json_response(new_tournament)
+
+
+@router.post("/tournaments/{id}/enroll/mass")
+@handle_json_error
+async def enroll_mass(request: web.Request) -> web.Response:
+    """Enrolls a list of ``{"player": id, "team": id}`` cards in one
+    transaction. Nothing is enrolled unless every player and team exists
+    and no player is listed twice or is already enrolled."""
+    info = await request.json()
+    tournament_id = request.match_info['id']
+    database = request.config_dict['DB']
+    enroll_list = info['list']
+    async with database.transaction() as db:
+        tournament = await fetch_tournament_light(db, tournament_id)
+        players = await check_ids(db, "players", "Player", [card['player'] for card in enroll_list])
+        await check_ids(db, "teams", "Team", {card['team'] for card in enroll_list})
+        enrolled = set(await fetch_enrolled_players(db, tournament['id'])).intersection(players)
+        if enrolled:
+            raise ValueError(f"Player {', '.join(map(str, sorted(enrolled)))} is already enrolled!")
+        cards = [
+            [id, player, tournament['id'], int(card['team'])]
+            for id, player, card in zip(generate_ids(request, 4, len(enroll_list)), players, enroll_list)
+        ]
+        await db.executemany(
+            "INSERT INTO enrollment (id, player_id, tournament_id, team_id) VALUES (?, ?, ?, ?)", cards
+        )
+        await db.executemany(
+            "INSERT OR IGNORE INTO tournament_standings (tournament_id, player_id) VALUES (?, ?)",
+            [[tournament['id'], card[1]] for card in cards]
+        )
+    invalidate(request, ("tournament", tournament['id']))
+    output = await fetch_enrollments(database.reader(), [card[0] for card in cards])
+    return json_response(output)
+
+
+@router.post("/tournaments/{id}/enroll")
+@handle_json_error
+async def enroll_individual(request: web.Request) -> web.Response:
+    info = await request.json()
+    tournament_id = request.match_info['id']
+    database = request.config_dict['DB']
+    player = info['player']
+    team = info['team']
+    id = generate_id(request, 4)
+    async with database.transaction() as db:
+        await db.execute(
+            "INSERT INTO enrollment (id, player_id, tournament_id, team_id) VALUES (?, ?, ?, ?)",
+            [id, player, tournament_id, team]
+        )
+        await db.execute(
+            "INSERT OR IGNORE INTO tournament_standings (tournament_id, player_id) VALUES (?, ?)",
+            [tournament_id, player]
+        )
+    invalidate(request, ("tournament", tournament_id))
+    enrollment = await fetch_enrollment(database.reader(), id)
+    return json_response(enrollment)
+
+
+async def fetch_pairing_inputs(db: aiosqlite.Connection, tournament_id: int) -> Tuple[List[PlayerT], List[Tuple[int, int, int]]]:
+    """The standings and game history a round is paired from."""
+    players_enrolled = await fetch_enrolled_standings(db, tournament_id)
+    history = [tuple(row) for row in await fetch_tournament_history(db, tournament_id)]
+    return players_enrolled, history
+
+
+def pair_round(engine: Callable[[List[Entrant]], Pairing], players_enrolled: List[PlayerT],
+               games: List[Tuple[int, int, int]]) -> Pairing:
+    history = build_history(games)
+    return engine([
+        Entrant(player['id'], player['score'], history.get(player['id']), player['byes'] > 0)
+        for player in players_enrolled
+    ])
+
+
+@router.post("/tournaments/{id}/organize/{round}")
+@handle_json_error
+async def organize_tournament(request: web.Request) -> web.Response:
+    """Pairs the next round. Pairing a large field can take a while, so it
+    runs in the executor from a reader, before the write transaction; the
+    transaction then checks that the standings and history it paired from
+    are still current, and pairs again if they are not."""
+    tournament_id = request.match_info['id']
+    round = request.match_info['round']
+    engine = ENGINES[request.query.get("engine", "swiss")]
+    database = request.config_dict['DB']
+    await fetch_tournament_light(database.reader(), tournament_id)
+
+    for _ in range(ORGANIZE_ATTEMPTS):
+        inputs = await fetch_pairing_inputs(database.reader(), tournament_id)
+        pairing = await asyncio.get_running_loop().run_in_executor(None, pair_round, engine, *inputs)
+        async with database.transaction() as db:
+            if await fetch_pairing_inputs(db, tournament_id) != inputs:
+                continue
+            tournament = await fetch_tournament_light(db, tournament_id)
+            created_games = []
+            for board, (white, black) in enumerate(pairing.pairs[:tournament['boards']]):
+                created = await setup_game(db, request.config_dict['IDS'], white=white, black=black, board=board,
+                                           round=round, tournament=tournament_id)
+                created_games.append(created)
+            if pairing.bye is not None:
+                await add_win(db, pairing.bye)
+                await record_standings(db, tournament_id, byes=[pairing.bye])
+                created_games.append({"bye": pairing.bye, "round": round})
+        break
+    else:
+        return json_response({"status": "standings kept changing while pairing; try again"}, status=409)
+
+    invalidate(request, ("tournament", tournament_id), ("player", pairing.bye))
+    publish(request, tournament_id, "round", {
+        "round": round,
+        "games": [
+            {"game": game['id'], "board": game['board'], "white": game['white']['id'], "black": game['black']['id']}
+            for game in created_games if "id" in game
+        ],
+        "bye": pairing.bye
+    })
+    return json_response({"list": created_games})
+
+
+@router.post("/tournaments/{id}/rounds/{round}/results")
+@handle_json_error
+async def submit_round_results(request: web.Request) -> web.Response:
+    """Resolves any number of a round's games at once. The body is
+    ``{"official": id, "results": [{"board": n, "result": player id or "draw"}]}``;
+    an entry may name its own official. Nothing is written unless every
+    entry is valid."""
+    tournament_id = request.match_info['id']
+    round = int(request.match_info['round'])
+    info = await request.json()
+    database = request.config_dict['DB']
+    async with database.transaction() as db:
+        tournament = await fetch_tournament_light(db, tournament_id)
+        async with db.execute(
+                queries.ROUND_RESULTS, [tournament['id'], round]
+        ) as cursor:
+            games = {row['board']: row for row in await cursor.fetchall()}
+
+        updates = []
+        wins, losses, draws = [], [], []
+        for entry in info['results']:
+            game = games.pop(entry['board'], None)
+            if game is None:
+                raise ValueError(f"No game on board {entry['board']} in round {round}, or it is listed twice!")
+            if game['result'] is not None or game['official'] is not None:
+                return json_response(
+                    {"status": f"game on board {entry['board']} already resolved!"}, status=409
+                )
+            result = entry['result']
+            if result == game['white']:
+                wins.append(game['white'])
+                losses.append(game['black'])
+            elif result == game['black']:
+                wins.append(game['black'])
+                losses.append(game['white'])
+            elif result == "draw":
+                draws += [game['white'], game['black']]
+            else:
+                raise ValueError(f"Result {result} on board {entry['board']} is neither player nor a draw!")
+            official = entry.get('official', info.get('official'))
+            if official is None:
+                raise ValueError(f"No official given for board {entry['board']}!")
+            updates.append([official, result, game['id']])
+
+        await load_entities(db, fetch_officials, "Official", {official for official, _, _ in updates})
+        await db.executemany("UPDATE games SET official = ?, result = ? WHERE id = ?", updates)
+        await add_results(db, wins, losses, draws)
+        await record_standings(db, tournament['id'], wins=wins, losses=losses, draws=draws)
+    invalidate(
+        request, ("tournament", tournament['id']),
+        *(("game", game_id) for _, _, game_id in updates),
+        *(("player", id) for id in wins + losses + draws)
+    )
+    if watched(request, tournament['id']):
+        publish(request, tournament['id'], "results", {
+            "round": round,
+            "games": [{"game": game_id, "result": result} for _, result, game_id in updates],
+            "standings": await fetch_standings_of(database.reader(), tournament['id'], wins + losses + draws)
+        })
+
+    return json_response(
+        {
+            "status": "ok",
+            "tournament": tournament,
+            "round": round,
+            "resolved": len(updates),
+            "games": await fetch_games_by_rounds(database.reader(), tournament['id'], round)
+        }
+    )
+
+
+@router.post("/tournaments/{id}/schedule")
+@handle_json_error
+async def schedule_tournament(request: web.Request) -> web.Response:
+    tournament_id = request.match_info['id']
+    info = await request.json()
+    format = info.get('format', "round-robin")
+    cycles = info.get('cycles', 1)
+    start_round = info.get('start_round', 1)
+    async with request.config_dict['DB'].transaction() as db:
+        tournament = await fetch_tournament_light(db, tournament_id)
+        if format == "round-robin":
+            players = info.get('players')
+            if players:
+                players = await check_ids(db, "players", "Player", players)
+            else:
+                players = await fetch_enrolled_players(db, tournament_id)
+            schedule = round_robin(players, cycles)
+        elif format == "team":
+            lineups = await fetch_lineups(db, tournament_id)
+            given = info.get('lineups', {})
+            teams = await check_ids(db, "teams", "Team", given)
+            await check_ids(db, "players", "Player", {id for players in given.values() for id in players})
+            lineups.update({team: [int(id) for id in players] for team, players in zip(teams, given.values())})
+            boards = info.get('boards') or min((len(players) for players in lineups.values()), default=0)
+            schedule = team_matches(lineups, boards, cycles)
+        else:
+            raise ValueError(f"Unknown schedule format {format}!")
+        if not schedule.games:
+            raise ValueError("The schedule has no games; enroll at least two players or teams!")
+        await create_scheduled_games(db, request.config_dict['IDS'], tournament['id'], schedule, start_round)
+    invalidate(request, ("tournament", tournament['id']))
+    summary = {
+        "id": tournament['id'],
+        "type": "schedule",
+        "format": format,
+        "rounds": len(schedule.rounds),
+        "boards": schedule.boards,
+        "games": schedule.games,
+        "byes": [{"round": start_round + index, "id": id} for index, id in schedule.byes]
+    }
+    publish(request, tournament['id'], "schedule", summary)
+    return json_response(summary)
+
+
+# Official Queries
+@router.get("/officials/{id}")
+@handle_json_error
+@conditional(official_versions)
+@cached("official")
+async def get_officials(request: web.Request) -> web.Response:
+    official_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    official = await fetch_official(db, official_id)
+    return json_response(official)
+
+
+@router.post("/officials")
+@handle_json_error
+async def create_officials(request: web.Request) -> web.Response:
+    info = await request.json()
+    id = generate_id(request, 3)
+    name = info['name']
+    email = info['email']
+    async with request.config_dict['DB'].transaction() as db:
+        await db.execute(
+            "INSERT INTO officials (id, name, email) VALUES(?, ?, ?)", [id, name, email]
+        )
+    return json_response(
+        {
+            "id": id,
+            "type": "official",
+            "name": name,
+            "email": email,
+            "verified": "false"
+        }
+    )
+
+
+@router.patch("/officials/{id}")
+@handle_json_error
+async def edit_official(request: web.Request) -> web.Response:
+    official_id = request.match_info['id']
+    official = await request.json()
+    database = request.config_dict['DB']
+    fields = {}
+    if "name" in official:
+        fields["name"] = official["name"]
+    if "email" in official:
+        fields["email"] = official["email"]
+    if fields:
+        field_names = ", ".join(f"{name} = ?" for name in fields)
+        field_values = list(fields.values())
+        async with database.transaction() as db:
+            await db.execute(
+                f"UPDATE officials SET {field_names} WHERE id = ?", field_values + [official_id]
+            )
+        invalidate(request, ("official", official_id))
+    new_official = await fetch_official(database.reader(), official_id)
+    return json_response(new_official)
+
+
+# Player Queries
+@router.post("/players")
+@handle_json_error
+async def create_player(request: web.Request) -> web.Response:
+    info = await request.json()
+    id = generate_id(request, 1)
+    name = info['name']
+    grade = info['grade']
+    team = info['team']
+    database = request.config_dict['DB']
+    team_obj = await fetch_team(database.reader(), team)
+    async with database.transaction() as db:
+        await db.execute(
+            "INSERT INTO players (id, name, grade, team) VALUES(?, ?, ?, ?)", [id, name, grade, team]
+        )
+    invalidate(request, ("team", team))
+    return json_response(
+        {
+            "id": id,
+            "type": "player",
+            "name": name,
+            "grade": grade,
+            "team": team_obj,
+            "wins": 0,
+            "losses": 0,
+            "draws": 0
+        }
+    )
+
+
+@router.get("/players")
+@handle_json_error
+async def list_players(request: web.Request) -> web.Response:
+    query = page_query(request, {"team": "team"})
+    db = request.config_dict['DB'].reader()
+    rows = await fetch_page(db, "players", query["limit"], query["after"], query["filters"])
+    return json_response(page(prime_players_light(db, rows), rows, query["limit"]))
+
+
+@router.get("/players/{id}/games")
+@handle_json_error
+async def list_player_games(request: web.Request) -> web.Response:
+    query = page_query(request, {"tournament": "tournament_id"})
+    db = request.config_dict['DB'].reader()
+    player = await fetch_player_light(db, request.match_info['id'])
+    rows = await fetch_player_games_page(db, player['id'], query["limit"], query["after"], query["filters"])
+    return json_response(page(await fetch_games_light_from_rows(db, rows[:query["limit"]]), rows, query["limit"]))
+
+
+@router.get("/players/{id}")
+@handle_json_error
+@conditional(player_versions)
+@cached("player")
+async def get_player(request: web.Request) -> web.Response:
+    player_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    player = await fetch_player(db, player_id)
+    return json_response(player)
+
+
+@router.patch("/players/{id}")
+@handle_json_error
+async def edit_player(request: web.Request) -> web.Response:
+    player_id = request.match_info['id']
+    player = await request.json()
+    database = request.config_dict['DB']
+    fields = {}
+    if "name" in player:
+        fields["name"] = player["name"]
+    if "grade" in player:
+        fields["grade"] = player["grade"]
+    if fields:
+        field_names = ", ".join(f"{name} = ?" for name in fields)
+        field_values = list(fields.values())
+        async with database.transaction() as db:
+            await db.execute(
+                f"UPDATE players SET {field_names} WHERE id = ?", field_values + [player_id]
+            )
+        invalidate(request, ("player", player_id))
+    new_player = await fetch_player(database.reader(), player_id)
+    return json_response(new_player)
+
+
+@router.delete("/players/{id}")
+@handle_json_error
+async def delete_players(request: web.Request) -> web.Response:
+    player_id = request.match_info['id']
+    async with request.config_dict['DB'].transaction() as db:
+        async with db.execute(queries.DELETE_PLAYER, [player_id]) as cursor:
+            if cursor.rowcount == 0:
+                return json_response({
+                    "status": f"Player {player_id} was not found"
+                }, status=404
+                )
+    invalidate(request, ("player", player_id))
+    return json_response({"status": "ok", "id": player_id})
+
+
+# Team Queries
+@router.post("/teams")
+@handle_json_error
+async def create_team(request: web.Request) -> web.Response:
+    info = await request.json()
+    id = generate_id(request, 2)
+    name = info['name']
+    sponsor = info['sponsor']
+    async with request.config_dict['DB'].transaction() as db:
+        await db.execute(
+            "INSERT INTO teams (id, name, sponsor_name) VALUES (?, ?, ?)", [id, name, sponsor]
+        )
+    return json_response(
+        {
+            "id": id,
+            "type": "team",
+            "name": name,
+            "sponsor": sponsor
+        }
+    )
+
+
+@router.get("/teams/{id}")
+@handle_json_error
+@conditional(team_versions)
+@cached("team")
+async def get_teams(request: web.Request) -> web.Response:
+    team_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    team = await fetch_team(db, team_id)
+    return json_response(team)
+
+
+@router.get("/teams/{id}/leaderboard")
+@handle_json_error
+@conditional(team_versions)
+@cached("team")
+async def get_team_lb(request: web.Request) -> web.Response:
+    team_id = request.match_info['id']
+    db = request.config_dict['DB'].reader()
+    team = await fetch_team_leaderboard(db, team_id)
+    return json_response(team)
+
+
+@router.patch("/teams/{id}")
+@handle_json_error
+async def edit_team(request: web.Request) -> web.Response:
+    team_id = request.match_info['id']
+    team = await request.json()
+    database = request.config_dict['DB']
+    fields = {}
+    if "name" in team:
+        fields["name"] = team["name"]
+    if "sponsor" in team:
+        fields["sponsor_name"] = team["sponsor"]
+    if fields:
+        field_names = ", ".join(f"{name} = ?" for name in fields)
+        field_values = list(fields.values())
+        async with database.transaction() as db:
+            await db.execute(
+                f"UPDATE teams SET {field_names} WHERE id = ?", field_values + [team_id]
+            )
+        invalidate(request, ("team", team_id))
+    new_team = await fetch_team(database.reader(), team_id)
+    return json_response(new_team)
+
+
+# Imports
+@router.post("/import/{entity}")
+@handle_json_error
+async def import_entities(request: web.Request) -> web.Response:
+    """Bulk-creates teams, players or enrollments from an NDJSON or CSV
+    upload with the same fields as the single-item endpoints (teams: name,
+    sponsor; players: name, grade, team; enrollments: tournament, player,
+    team). Team, player and tournament references are checked against the
+    ids that exist when the import starts."""
+    entity = request.match_info['entity']
+    database = request.config_dict['DB']
+    reader = database.reader()
+    touched = set()
+
+    def existing(ids: Set[int], kind: str, value: Any) -> int:
+        id = int(value)
+        if id not in ids:
+            raise ValueError(f"{kind} {id} does not exist!")
+        return id
+
+    if entity == "teams":
+        def validate(record: Dict[str, Any]) -> List[Any]:
+            if not str(record['name']).strip():
+                raise ValueError("name is empty")
+            return [str(record['name']), record.get('sponsor')]
+
+        async def write(rows: List[List[Any]]) -> None:
+            async with database.transaction() as db:
+                await db.executemany(
+                    "INSERT INTO teams (id, name, sponsor_name) VALUES (?, ?, ?)",
+                    [[id, *row] for id, row in zip(generate_ids(request, 2, len(rows)), rows)]
+                )
+    elif entity == "players":
+        teams = await fetch_ids(reader, "teams")
+
+        def validate(record: Dict[str, Any]) -> List[Any]:
+            if not str(record['name']).strip():
+                raise ValueError("name is empty")
+            row = [str(record['name']), int(record['grade']), existing(teams, "Team", record['team'])]
+            touched.add(("team", row[2]))
+            return row
+
+        async def write(rows: List[List[Any]]) -> None:
+            async with database.transaction() as db:
+                await db.executemany(
+                    "INSERT INTO players (id, name, grade, team) VALUES (?, ?, ?, ?)",
+                    [[id, *row] for id, row in zip(generate_ids(request, 1, len(rows)), rows)]
+                )
+    elif entity == "enrollments":
+        teams, players, tournaments = await asyncio.gather(
+            fetch_ids(reader, "teams"), fetch_ids(reader, "players"), fetch_ids(reader, "tournaments")
+        )
+
+        def validate(record: Dict[str, Any]) -> List[Any]:
+            row = [
+                existing(players, "Player", record['player']),
+                existing(tournaments, "Tournament", record['tournament']),
+                existing(teams, "Team", record['team'])
+            ]
+            touched.add(("tournament", row[1]))
+            return row
+
+        async def write(rows: List[List[Any]]) -> None:
+            async with database.transaction() as db:
+                await db.executemany(
+                    "INSERT INTO enrollment (id, player_id, tournament_id, team_id) VALUES (?, ?, ?, ?)",
+                    [[id, *row] for id, row in zip(generate_ids(request, 4, len(rows)), rows)]
+                )
+                await db.executemany(
+                    "INSERT OR IGNORE INTO tournament_standings (tournament_id, player_id) VALUES (?, ?)",
+                    [[tournament, player] for player, tournament, _ in rows]
+                )
+    else:
+        raise ValueError(f"Cannot import {entity}; expected teams, players or enrollments!")
+
+    try:
+        report = await run_import(request, entity, validate, write)
+    finally:
+        invalidate(request, *touched)
+    return json_response(report.to_json())
+
+
+# Exports
+@router.get("/export/games")
+@handle_json_error
+async def export_games(request: web.Request) -> web.StreamResponse:
+    filters = page_query(request, {"tournament": "g.tournament_id"})["filters"]
+    where = " AND ".join(f"{column} = ?" for column in filters)
+    async with request.config_dict['DB'].snapshot() as db:
+        return await stream_rows(
+            request, db, "games",
+            f"""SELECT g.id, g.tournament_id, t.name AS tournament, g.round, g.board,
+                   g.white, w.name AS white_name, g.black, b.name AS black_name, g.official, g.result
+            FROM games g
+            LEFT JOIN tournaments t ON t.id = g.tournament_id
+            LEFT JOIN players w ON w.id = g.white
+            LEFT JOIN players b ON b.id = g.black
+            {"WHERE " + where if where else ""}
+            ORDER BY g.id""", list(filters.values())
+        )
+
+
+@router.get("/export/players")
+@handle_json_error
+async def export_players(request: web.Request) -> web.StreamResponse:
+    filters = page_query(request, {"team": "p.team"})["filters"]
+    where = " AND ".join(f"{column} = ?" for column in filters)
+    async with request.config_dict['DB'].snapshot() as db:
+        return await stream_rows(
+            request, db, "players",
+            f"""SELECT p.id, p.name, p.grade, p.team, t.name AS team_name, p.wins, p.losses, p.draws
+            FROM players p
+            LEFT JOIN teams t ON t.id = p.team
+            {"WHERE " + where if where else ""}
+            ORDER BY p.id""", list(filters.values())
+        )
+
+
+@router.get("/export/standings")
+@handle_json_error
+async def export_standings(request: web.Request) -> web.StreamResponse:
+    filters = page_query(request, {"tournament": "s.tournament_id"})["filters"]
+    where = " AND ".join(f"{column} = ?" for column in filters)
+    async with request.config_dict['DB'].snapshot() as db:
+        return await stream_rows(
+            request, db, "standings",
+            f"""SELECT s.tournament_id, t.name AS tournament, s.player_id, p.name AS player,
+                   s.wins, s.losses, s.draws, s.byes, s.score
+            FROM tournament_standings s
+            LEFT JOIN tournaments t ON t.id = s.tournament_id
+            LEFT JOIN players p ON p.id = s.player_id
+            {"WHERE " + where if where else ""}
+            ORDER BY s.tournament_id, s.score DESC, s.wins DESC, s.player_id""", list(filters.values())
+        )
+
+
+@router.get("/cache/stats")
+@handle_json_error
+async def cache_stats(request: web.Request) -> web.Response:
+    return json_response(request.config_dict['CACHE'].stats())
+
+
+@router.get("/live/stats")
+@handle_json_error
+async def live_stats(request: web.Request) -> web.Response:
+    return json_response(request.config_dict['LIVE'].stats())
+
+
+# Ping
+@router.get("/ping")
+@handle_json_error
+async def ping(request: web.Request) -> web.Response:
+    return json_response(data={"ping": "pong"})
+
+
+@router.get("/metrics")
+async def get_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=exposition(request.app).encode(), headers={
+        "Content-Type": "text/plain; version=0.0.4; charset=utf-8"
+    })
+
+
+# Tables whose ids come from the IdGenerator.
+GENERATED_ID_TABLES = ("teams", "players", "officials", "tournaments", "games", "enrollment")
+
+
+async def fetch_highest_id(db: aiosqlite.Connection) -> int:
+    """The highest id in use in the current layout; ids from the earlier
+    63-bit layout are all above MAX_ID and are skipped."""
+    highest = " UNION ALL ".join(f"SELECT MAX(id) AS id FROM {table} WHERE id <= :max" for table in GENERATED_ID_TABLES)
+    async with db.execute(f"SELECT COALESCE(MAX(id), 0) FROM ({highest})", {"max": MAX_ID}) as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def init_db(app: web.Application) -> AsyncIterator[None]:
+    settings = app["CONFIG"]["database"]
+    if settings["migrate"]:
+        await asyncio.get_running_loop().run_in_executor(None, migrate, Path(settings["path"]))
+    db = Database(
+        Path(settings["path"]),
+        readers=settings["readers"],
+        busy_timeout_ms=settings["busy_timeout_ms"],
+        group_commit_ms=settings["group_commit_ms"],
+        group_commit_max=settings["group_commit_max"],
+        instrumented=app["CONFIG"]["instrumentation"]["enabled"],
+        slow_query_ms=app["CONFIG"]["instrumentation"]["slow_query_ms"]
+    )
+    await db.open()
+    app["DB"] = db
+    app["IDS"].advance_past(await fetch_highest_id(db.writer))
+    yield
+    await db.close()
+
+
+async def close_live(app: web.Application) -> None:
+    app["LIVE"].close()
+
+
+async def open_channel(app: web.Application) -> AsyncIterator[None]:
+    channel: Channel | None = app.get("CHANNEL")
+    if channel is None:
+        yield
+        return
+
+    hub: Hub = app["LIVE"]
+
+    def invalidated(sender: int, tags: List[List[Any]] | None) -> None:
+        cache: ResponseCache | None = app.get("CACHE")
+        if cache is not None and tags is None:
+            cache.clear()
+        elif cache is not None:
+            cache.invalidate(tuple(tag) for tag in tags)
+
+    channel.on("invalidate", invalidated)
+    channel.on("publish", lambda sender, message: hub.publish(*message))
+    channel.on("disconnect", lambda sender, tournament_id: hub.disconnect(tournament_id))
+    hub.on_watch = lambda tournament_id, watching: channel.send("watch", [tournament_id, watching])
+    channel.open(lambda: list(hub.channels))
+    yield
+    channel.close()
+
+
+async def run_probes(app: web.Application) -> AsyncIterator[None]:
+    task = asyncio.ensure_future(probe_readers(app))
+    yield
+    task.cancel()
+
+
+def create_app(config: Dict[str, Any], channel: Channel | None = None) -> web.Application:
+    """Builds the app without touching the database; migrations and
+    connections happen when it starts. ``config`` is laid over the defaults
+    in config.py. ``channel`` connects the worker processes when serving
+    from several of them (see workers.py)."""
+    config = with_defaults(config)
+
+    middlewares = [metrics_middleware, compression_middleware, custom_auth, loader_middleware, serializer_middleware]
+    settings = config["instrumentation"]
+    if settings["enabled"]:
+        middlewares.insert(1, instrument_middleware(
+            slow_request_ms=settings["slow_request_ms"],
+            server_timing=settings["server_timing"]
+        ))
+    app = web.Application(middlewares=middlewares)
+    app["CONFIG"] = config
+    app["IDS"] = IdGenerator(config["node_id"])
+    app.add_routes(router)
+    app.cleanup_ctx.append(init_db)
+    app.cleanup_ctx.append(run_probes)
+    app.cleanup_ctx.append(open_channel)
+    app["CHANNEL"] = channel
+    app["METRICS"] = Metrics()
+    app["CACHE"] = ResponseCache(
+        max_entries=config["cache"]["max_entries"],
+        max_bytes=config["cache"]["max_bytes"]
+    )
+    app["SERIALIZER"] = Serializer(config["serializer"]["backend"], config["serializer"]["fragments"])
+    settings = config["compression"]
+    if settings["enabled"]:
+        app["COMPRESSION"] = Compression(
+            encodings=settings["encodings"],
+            min_bytes=settings["min_bytes"],
+            cache_bytes=settings["cache_bytes"]
+        )
+    app["LIVE"] = Hub(encode=app["SERIALIZER"].encode)
+    app.on_shutdown.append(close_live)
+    return app
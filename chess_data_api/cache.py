@@ -0,0 +1,227 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, Optional, Sequence, Set, Tuple
+
+from aiohttp import web
+
+
+Tag = Tuple[str, int]
+
+
+def document_tags(document: Any) -> Iterator[Tag]:
+    """Yields ``(type, id)`` for every entity embedded in a response
+    document, which is everything whose change makes the document stale."""
+    stack = [document]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if "type" in item and "id" in item:
+                try:
+                    yield item["type"], int(item["id"])
+                except (TypeError, ValueError):
+                    pass
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+class ResponseCache:
+    """Serialized GET responses, evicted least-recently-used once either
+    ``max_entries`` or ``max_bytes`` is exceeded.
+
+    Entries are tagged with the entities they embed; a write invalidates
+    the tags it touched. Every invalidation bumps ``generation``, and a
+    response built from a read that started before it is not stored, so a
+    slow read can never put back what a write just removed.
+
+    Entries can also carry the ETag of the versions they were built from;
+    a lookup under different versions is a miss, so a write is never
+    answered with the old body under its new ETag, even before its
+    invalidation arrives (from another worker, say).
+
+    Identical misses that arrive while the first one is still being built
+    wait for it instead of building their own (single-flight), as long as
+    no invalidation happened in between."""
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Hashable, Tuple[bytes, Set[Tag], Optional[str]]] = OrderedDict()
+        self.tagged: Dict[Tag, Set[Hashable]] = {}
+        self.size = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.inflight: Dict[Tuple[Hashable, int, Optional[str]], asyncio.Future] = {}
+        self.coalesced = 0
+
+    def get(self, key: Hashable, etag: Optional[str] = None) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None or entry[2] != etag:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, body: bytes, tags: Iterable[Tag], generation: int,
+            etag: Optional[str] = None) -> None:
+        if generation != self.generation or len(body) > self.max_bytes:
+            return
+        self.discard(key)
+        tags = set(tags)
+        self.entries[key] = (body, tags, etag)
+        self.size += len(body)
+        for tag in tags:
+            self.tagged.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self.discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        body, tags, _ = entry
+        self.size -= len(body)
+        for tag in tags:
+            keys = self.tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tagged[tag]
+
+    def invalidate(self, tags: Iterable[Tag]) -> None:
+        self.generation += 1
+        for tag in tags:
+            for key in list(self.tagged.get(tag, ())):
+                self.discard(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.tagged.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "inflight": len(self.inflight),
+            "coalesced": self.coalesced,
+        }
+
+
+def cached(kind: str) -> Callable[[Callable[[web.Request], Awaitable[web.Response]]],
+                                  Callable[[web.Request], Awaitable[web.Response]]]:
+    """Serves a GET handler from the app's response cache. ``kind`` is the
+    entity type named by the route's ``id``, which is tagged on the entry
+    even when the document does not embed it (e.g. a team's leaderboard).
+    Under ``conditional`` the entry is tied to the ETag it was built for."""
+    def decorator(func: Callable[[web.Request], Awaitable[web.Response]]) \
+            -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def handler(request: web.Request) -> web.Response:
+            cache: Optional[ResponseCache] = request.config_dict.get("CACHE")
+            if cache is None:
+                return await func(request)
+
+            key = request.path_qs
+            etag = request.get("ETAG")
+            body = cache.get(key, etag)
+            if body is not None:
+                return web.Response(body=body, content_type="application/json")
+
+            flight = (key, cache.generation, etag)
+            build = cache.inflight.get(flight)
+            if build is None:
+                build = asyncio.ensure_future(render(cache, func, request, kind, flight))
+                cache.inflight[flight] = build
+                build.add_done_callback(lambda _: cache.inflight.pop(flight, None))
+            else:
+                cache.coalesced += 1
+
+            # shielded so a caller that goes away does not cancel the others
+            status, body = await asyncio.shield(build)
+            return web.Response(status=status, body=body, content_type="application/json")
+
+        return handler
+
+    return decorator
+
+
+async def render(cache: ResponseCache, func: Callable[[web.Request], Awaitable[web.Response]],
+                 request: web.Request, kind: str, flight: Tuple[Hashable, int, Optional[str]]) -> Tuple[int, bytes]:
+    key, generation, etag = flight
+    response = await func(request)
+    body = response.body if isinstance(response.body, bytes) else b""
+    if response.status == 200:
+        tags = set(document_tags(json.loads(body)))
+        try:
+            tags.add((kind, int(request.match_info['id'])))
+        except (KeyError, ValueError):
+            pass
+        cache.put(key, body, tags, generation, etag)
+    return response.status, body
+
+
+def invalidate(request: web.Request, *tags: Tuple[str, Any]) -> None:
+    """Drops every cached response that embeds one of the given entities,
+    in this worker and (through the channel) in the others. Call it once
+    the write has committed."""
+    tags = [(kind, int(id)) for kind, id in tags if str(id).isdigit()]
+    cache: Optional[ResponseCache] = request.config_dict.get("CACHE")
+    if cache is not None:
+        cache.invalidate(tags)
+    channel = request.config_dict.get("CHANNEL")
+    if channel is not None and not channel.send("invalidate", tags):
+        channel.send("invalidate", None)
+
+
+def conditional(versions: Callable[[Any, str], Awaitable[Optional[Sequence[Any]]]]) \
+        -> Callable[[Callable[[web.Request], Awaitable[web.Response]]],
+                    Callable[[web.Request], Awaitable[web.Response]]]:
+    """Answers If-None-Match from row versions alone. ``versions`` looks up
+    the versions of everything the document embeds (None if the entity does
+    not exist). They are read before the body is built, and ``cached``
+    only reuses a body stored under the same ETag, so the body sent with an
+    ETag is never older than the versions it names. The ETag is left in
+    ``request["ETAG"]`` for ``cached`` and for handlers that stream their
+    body."""
+    def decorator(func: Callable[[web.Request], Awaitable[web.Response]]) \
+            -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def handler(request: web.Request) -> web.Response:
+            found = await versions(request.config_dict['DB'].reader(), request.match_info['id'])
+            if found is None:
+                return await func(request)
+
+            etag = '"' + "-".join(str(int(version or 0)) for version in found) + '"'
+            matches = if_none_match(request)
+            if etag in matches or "*" in matches:
+                return web.Response(status=304, headers={"ETag": etag})
+
+            request["ETAG"] = etag
+            response = await func(request)
+            if response.status == 200 and not response.prepared:
+                response.headers["ETag"] = etag
+            return response
+
+        return handler
+
+    return decorator
+
+
+def if_none_match(request: web.Request) -> Set[str]:
+    header = request.headers.get("If-None-Match", "")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
@@ -0,0 +1,185 @@
+"""Messages between the worker processes of one server (see workers.py).
+
+Each worker binds a unix datagram socket in a directory shared by all of
+them and sends small JSON messages to the others: cache invalidations,
+live events, and which tournaments it has viewers for. Messages to a
+worker whose queue is full wait in a per-peer backlog until it drains, so
+none are dropped while both ends are up; a worker that is (re)starting has
+an empty cache and asks the others for their viewers with ``hello``."""
+import asyncio
+import json
+import os
+import socket
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+
+# Larger messages are not sent; live events fall back to a "disconnect".
+MAX_DATAGRAM = 128 * 1024
+
+Handler = Callable[[int, Any], None]
+
+
+class Channel:
+    def __init__(self, directory: Path, index: int, workers: int):
+        self.directory = Path(directory)
+        self.index = index
+        self.workers = workers
+        self.sock: Optional[socket.socket] = None
+        self.peers: Dict[int, socket.socket] = {}
+        self.backlog: Dict[int, Deque[bytes]] = {}
+        self.handlers: Dict[str, Handler] = {"watch": self.remote_watch}
+        self.remote: Dict[int, Set[int]] = {}
+        self.sent = 0
+        self.received = 0
+        self.oversized = 0
+
+    def path(self, index: int) -> str:
+        return str(self.directory / f"worker-{index}.sock")
+
+    def open(self, watching: Callable[[], Iterable[int]]) -> None:
+        """Starts receiving; ``watching`` lists the tournaments this worker
+        has viewers for, sent to any worker that says hello."""
+        path = self.path(self.index)
+        if os.path.exists(path):
+            os.unlink(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind(path)
+        asyncio.get_running_loop().add_reader(self.sock, self.receive)
+
+        def hello(sender: int, _: Any) -> None:
+            self.disconnect(sender)
+            for tournament_id in watching():
+                self.send("watch", [tournament_id, True], to=[sender])
+
+        self.on("hello", hello)
+        self.send("hello", None)
+
+    def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        for index, peer in self.peers.items():
+            if self.backlog.get(index):
+                loop.remove_writer(peer)
+            peer.close()
+        self.peers = {}
+        self.backlog = {}
+        if self.sock is not None:
+            loop.remove_reader(self.sock)
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path(self.index))
+            except FileNotFoundError:
+                pass
+
+    def on(self, kind: str, handler: Handler) -> None:
+        self.handlers[kind] = handler
+
+    def send(self, kind: str, payload: Any, to: Optional[Iterable[int]] = None) -> bool:
+        """Sends to every other worker (or just ``to``). Returns False if the
+        message is too large to send."""
+        data = json.dumps([self.index, kind, payload]).encode()
+        if len(data) > MAX_DATAGRAM:
+            self.oversized += 1
+            return False
+        for index in (range(self.workers) if to is None else to):
+            if index != self.index:
+                self.deliver(index, data)
+        self.sent += 1
+        return True
+
+    def deliver(self, index: int, data: bytes, retry: bool = True) -> None:
+        backlog = self.backlog.setdefault(index, deque())
+        if backlog:
+            backlog.append(data)
+            return
+        peer = self.connect(index)
+        if peer is None:
+            return
+        try:
+            peer.send(data)
+        except BlockingIOError:
+            backlog.append(data)
+            asyncio.get_running_loop().add_writer(peer, self.drain, index)
+        except OSError:
+            # it went away; if it has been restarted, reconnect to the new socket
+            self.disconnect(index)
+            if retry:
+                self.deliver(index, data, retry=False)
+
+    def connect(self, index: int) -> Optional[socket.socket]:
+        peer = self.peers.get(index)
+        if peer is None:
+            peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            peer.setblocking(False)
+            try:
+                peer.connect(self.path(index))
+            except OSError:
+                peer.close()
+                return None
+            self.peers[index] = peer
+        return peer
+
+    def disconnect(self, index: int) -> None:
+        peer = self.peers.pop(index, None)
+        if peer is not None:
+            if self.backlog.pop(index, None):
+                asyncio.get_running_loop().remove_writer(peer)
+            peer.close()
+        self.remote_forget(index)
+
+    def drain(self, index: int) -> None:
+        peer, backlog = self.peers[index], self.backlog[index]
+        while backlog:
+            try:
+                peer.send(backlog[0])
+            except BlockingIOError:
+                return
+            except OSError:
+                self.disconnect(index)
+                return
+            backlog.popleft()
+        asyncio.get_running_loop().remove_writer(peer)
+
+    def receive(self) -> None:
+        while True:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM)
+            except BlockingIOError:
+                return
+            sender, kind, payload = json.loads(data)
+            self.received += 1
+            handler = self.handlers.get(kind)
+            if handler is not None:
+                handler(sender, payload)
+
+    def remote_watch(self, sender: int, payload: List[Any]) -> None:
+        tournament_id, watching = payload
+        if watching:
+            self.remote.setdefault(tournament_id, set()).add(sender)
+        else:
+            remote = self.remote.get(tournament_id)
+            if remote is not None:
+                remote.discard(sender)
+                if not remote:
+                    del self.remote[tournament_id]
+
+    def remote_forget(self, index: int) -> None:
+        for tournament_id in [id for id, remote in self.remote.items() if index in remote]:
+            self.remote_watch(index, [tournament_id, False])
+
+    def watched(self, tournament_id: int) -> bool:
+        """Whether another worker has viewers for the tournament."""
+        return tournament_id in self.remote
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "worker": self.index,
+            "workers": self.workers,
+            "sent": self.sent,
+            "received": self.received,
+            "oversized": self.oversized,
+            "backlog": sum(len(backlog) for backlog in self.backlog.values()),
+        }
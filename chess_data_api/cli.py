@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+
+from aiohttp import web
+
+from .app import create_app, rebuild_standings
+from .config import load_config
+from .database import Database, migrate
+from .workers import serve
+
+
+async def rebuild(path: Path) -> None:
+    """Recomputes every tournament's standings from its games."""
+    db = Database(path, readers=1)
+    await db.open()
+    try:
+        async with db.transaction() as conn:
+            await rebuild_standings(conn)
+    finally:
+        await db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m chess_data_api", description="Serve the chess data API.")
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    parser.add_argument("--db", type=Path, help="database file, instead of database.path in the config")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes sharing the port (SO_REUSEPORT); 1 serves in this process")
+    parser.add_argument("--migrate", action="store_true", help="apply pending migrations and exit")
+    parser.add_argument("--rebuild-standings", action="store_true",
+                        help="recompute all standings from the games table and exit")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.db is not None:
+        config["database"]["path"] = str(args.db)
+
+    if args.migrate:
+        for name in migrate(Path(config["database"]["path"])):
+            print(f"applied {name}")
+    elif args.rebuild_standings:
+        asyncio.run(rebuild(Path(config["database"]["path"])))
+    elif args.workers > 1:
+        serve(config, args.workers, args.host, args.port)
+    else:
+        web.run_app(create_app(config), host=args.host, port=args.port)
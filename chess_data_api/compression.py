@@ -0,0 +1,298 @@
+"""Content-Encoding for responses, negotiated from Accept-Encoding.
+
+gzip is always available; brotli and zstd when the ``brotli`` and
+``zstandard`` packages are installed. Bodies below ``min_bytes`` go out as
+they are. Responses that set their own Content-Encoding, and streamed ones
+(exports, live events), are left to compress themselves; streams go
+through ``prepare`` and ``Writer``.
+
+Tournament documents repeat the same player objects in every game, so they
+compress well (about 12x with gzip). Compressed bodies are kept by a digest
+of the uncompressed body, so a document served from the response cache is
+not compressed again on every request, and a changed document can never be
+answered with an old one's bytes.
+"""
+import asyncio
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Protocol, Sequence
+
+from aiohttp import hdrs, web
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+
+# bodies at least this big are compressed off the event loop (zlib,
+# brotli and zstandard all release the GIL while they work)
+EXECUTOR_BYTES = 256 * 1024
+
+
+class Encoder(Protocol):
+    """Incremental compressor with zlib's ``compress``/``flush`` interface."""
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+
+# levels are tuned for dynamic responses, where speed matters more than
+# the last few percent
+ENCODINGS: Dict[str, Callable[[], Encoder]] = {"gzip": lambda: GzipEncoder(5)}
+if brotli is not None:
+    ENCODINGS["br"] = lambda: BrotliEncoder(5)
+if zstandard is not None:
+    ENCODINGS["zstd"] = lambda: ZstdEncoder(3)
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    encoder = ENCODINGS[encoding]()
+    return encoder.compress(body) + encoder.flush()
+
+
+def accepted(header: str) -> Dict[str, float]:
+    """Parses Accept-Encoding into ``{coding: q}``."""
+    codings = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def negotiate(request: web.Request, preferred: Sequence[str]) -> Optional[str]:
+    """The first of ``preferred`` that is available and that the client
+    accepts, or None to send the body as it is."""
+    codings = accepted(request.headers.get(hdrs.ACCEPT_ENCODING, ""))
+    wildcard = codings.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in preferred:
+        if encoding not in ENCODINGS:
+            continue
+        q = codings.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressible(response: web.StreamResponse) -> bool:
+    return (
+        type(response) is web.Response
+        and not response.prepared
+        and hdrs.CONTENT_ENCODING not in response.headers
+        and isinstance(response.body, bytes)
+        and response.content_type.startswith(COMPRESSIBLE)
+    )
+
+
+def vary(response: web.StreamResponse) -> None:
+    values = [value.strip() for value in response.headers.get(hdrs.VARY, "").split(",") if value.strip()]
+    if "accept-encoding" not in (value.lower() for value in values):
+        response.headers[hdrs.VARY] = ", ".join(values + ["Accept-Encoding"])
+
+
+class CompressionCache:
+    """Compressed bodies keyed by encoding and a digest of the body, evicted
+    least-recently-used once ``max_bytes`` is exceeded."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class Compression:
+    """Settings and counters shared by the middleware and streamed
+    responses."""
+
+    def __init__(self, encodings: Sequence[str] = ("zstd", "br", "gzip"), min_bytes: int = 1024,
+                 cache_bytes: int = 16 * 1024 * 1024):
+        self.encodings = [encoding for encoding in encodings if encoding in ENCODINGS]
+        self.min_bytes = min_bytes
+        self.cache = CompressionCache(cache_bytes)
+        self.bytes_in: Dict[str, int] = {}
+        self.bytes_out: Dict[str, int] = {}
+
+    def negotiate(self, request: web.Request) -> Optional[str]:
+        return negotiate(request, self.encodings)
+
+    def count(self, encoding: str, size_in: int, size_out: int) -> None:
+        self.bytes_in[encoding] = self.bytes_in.get(encoding, 0) + size_in
+        self.bytes_out[encoding] = self.bytes_out.get(encoding, 0) + size_out
+
+    async def apply(self, request: web.Request, response: web.Response) -> None:
+        body: bytes = response.body
+        vary(response)
+        if len(body) < self.min_bytes:
+            return
+        encoding = self.negotiate(request)
+        if encoding is None:
+            return
+
+        # only documents with an ETag are likely to be asked for again
+        etag = response.headers.get(hdrs.ETAG)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest()) if etag else None
+        compressed = self.cache.get(key) if key else None
+        if compressed is None:
+            if len(body) >= EXECUTOR_BYTES:
+                compressed = await asyncio.get_running_loop().run_in_executor(None, compress, encoding, body)
+            else:
+                compressed = compress(encoding, body)
+            if key:
+                self.cache.put(key, compressed)
+        self.count(encoding, len(body), len(compressed))
+
+        response.body = compressed
+        response.headers[hdrs.CONTENT_ENCODING] = encoding
+        if etag and not etag.startswith("W/"):
+            # the encoded bytes differ from the identity ones; If-None-Match
+            # compares weakly, so conditional requests still match
+            response.headers[hdrs.ETAG] = "W/" + etag
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "encodings": self.encodings,
+            "min_bytes": self.min_bytes,
+            "bytes_in": dict(self.bytes_in),
+            "bytes_out": dict(self.bytes_out),
+            "cached": len(self.cache.entries),
+            "cached_bytes": self.cache.size,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+
+@web.middleware
+async def compression_middleware(request: web.Request,
+                                 handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> web.StreamResponse:
+    response = await handler(request)
+    compression: Optional[Compression] = request.config_dict.get("COMPRESSION")
+    if compression is not None and compressible(response):
+        await compression.apply(request, response)
+    return response
+
+
+async def prepare(request: web.Request, response: web.StreamResponse) -> Optional[Encoder]:
+    """Prepares a streamed ``response``, returning the encoder its chunks
+    must go through (None when they are sent as they are).
+
+    ``min_bytes`` does not apply here: Content-Encoding has to be chosen
+    before the first chunk, when the length is not known, and the streamed
+    endpoints (exports, tournaments by round) are the largest bodies the API
+    sends."""
+    compression: Optional[Compression] = request.config_dict.get("COMPRESSION")
+    encoding = compression.negotiate(request) if compression is not None else None
+    vary(response)
+    if encoding is not None:
+        response.headers[hdrs.CONTENT_ENCODING] = encoding
+        etag = response.headers.get(hdrs.ETAG)
+        if etag and not etag.startswith("W/"):
+            response.headers[hdrs.ETAG] = "W/" + etag
+    await response.prepare(request)
+    return ENCODINGS[encoding]() if encoding is not None else None
+
+
+class Writer:
+    """Writes chunks of a streamed response through its encoder, counting
+    them in the app's compression stats."""
+
+    def __init__(self, request: web.Request, response: web.StreamResponse, encoder: Optional[Encoder]):
+        self.response = response
+        self.encoder = encoder
+        self.compression: Optional[Compression] = request.config_dict.get("COMPRESSION")
+        self.encoding = response.headers.get(hdrs.CONTENT_ENCODING)
+        self.size_in = 0
+        self.size_out = 0
+
+    async def write(self, chunk: bytes) -> None:
+        self.size_in += len(chunk)
+        if self.encoder is not None:
+            chunk = self.encoder.compress(chunk)
+        if chunk:
+            self.size_out += len(chunk)
+            await self.response.write(chunk)
+
+    async def close(self) -> None:
+        if self.encoder is not None:
+            tail = self.encoder.flush()
+            self.size_out += len(tail)
+            await self.response.write(tail)
+            if self.compression is not None:
+                self.compression.count(self.encoding, self.size_in, self.size_out)
+        await self.response.write_eof()
@@ -0,0 +1,71 @@
+"""Settings: a JSON file (config.json by default) laid over DEFAULTS.
+
+Only ``username`` and ``password`` have no default. A relative
+``database.path`` in a file is taken relative to that file."""
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+
+DEFAULTS: Dict[str, Any] = {
+    "node_id": 0,
+    "database": {
+        "path": "db.sqlite3",
+        # apply pending migrations when the app starts
+        "migrate": True,
+        "readers": 4,
+        "busy_timeout_ms": 5000,
+        "group_commit_ms": 0,
+        "group_commit_max": 64,
+    },
+    "cache": {
+        "max_entries": 4096,
+        "max_bytes": 64 * 1024 * 1024,
+    },
+    "serializer": {
+        # "auto" uses orjson when it is installed
+        "backend": "auto",
+        # encoded player, game, ... documents kept for reuse (json backend only)
+        "fragments": 65536,
+    },
+    "compression": {
+        "enabled": True,
+        # in order of preference; br and zstd need the brotli and zstandard packages
+        "encodings": ["zstd", "br", "gzip"],
+        "min_bytes": 1024,
+        # compressed documents kept for reuse, by a digest of their body
+        "cache_bytes": 16 * 1024 * 1024,
+    },
+    "instrumentation": {
+        "enabled": False,
+        "slow_query_ms": 100,
+        "slow_request_ms": 1000,
+        "server_timing": True,
+    },
+}
+
+
+def merge(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def with_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+    config = merge(DEFAULTS, config)
+    missing = [key for key in ("username", "password") if key not in config]
+    if missing:
+        raise ValueError(f"Config is missing {', '.join(missing)}!")
+    return config
+
+
+def load_config(path: Path = Path("config.json")) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        config = with_defaults(json.load(f))
+    config["database"]["path"] = str(Path(path).parent / config["database"]["path"])
+    return config
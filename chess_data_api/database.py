@@ -0,0 +1,206 @@
+import asyncio
+import importlib.util
+import itertools
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List
+
+import aiosqlite
+
+from .instrument import InstrumentedConnection
+from .loaders import clear_loaders
+from .metrics import Histogram
+
+
+class Database:
+    """A pool of read-only connections plus one writer that owns every
+    INSERT/UPDATE/DELETE. The database runs in WAL mode, so readers never
+    wait on the writer and writes are serialized in-process.
+
+    With a group-commit window, write transactions that arrive within
+    ``group_commit_ms`` of each other share a single COMMIT (and fsync).
+    Each one still runs in its own savepoint, so a failing handler only
+    rolls back its own changes, and none of them returns before the shared
+    commit is durable.
+
+    With ``instrumented`` set, every connection is wrapped so statements are
+    counted and timed per request, and those taking ``slow_query_ms`` or
+    longer are logged (see instrument.py)."""
+
+    def __init__(self, path: Path, readers: int = 4, busy_timeout_ms: int = 5000,
+                 group_commit_ms: float = 0, group_commit_max: int = 64, instrumented: bool = False,
+                 slow_query_ms: float = 100):
+        self.path = path
+        self.reader_count = max(1, readers)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.group_commit_ms = group_commit_ms
+        self.group_commit_max = max(1, group_commit_max)
+        self.instrumented = instrumented
+        self.slow_query_ms = slow_query_ms
+        self.readers: List[aiosqlite.Connection] = []
+        self.writer: aiosqlite.Connection | None = None
+        self.write_lock = asyncio.Lock()
+        self.next_reader = itertools.cycle(())
+        self.group: asyncio.Future | None = None
+        self.group_size = 0
+        self.write_wait = Histogram()
+        self.commit_latency = Histogram()
+        self.committed = 0
+        self.rolled_back = 0
+
+    async def open(self) -> None:
+        # isolation_level=None leaves transaction control to transaction()
+        self.writer = await aiosqlite.connect(self.path, isolation_level=None)
+        self.writer.row_factory = aiosqlite.Row
+        await self.writer.execute("PRAGMA journal_mode = WAL")
+        await self.writer.execute("PRAGMA synchronous = NORMAL")
+        await self.writer.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        self.writer = self.wrap(self.writer)
+
+        for _ in range(self.reader_count):
+            reader = await aiosqlite.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True)
+            reader.row_factory = aiosqlite.Row
+            await reader.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            self.readers.append(self.wrap(reader))
+
+        self.next_reader = itertools.cycle(self.readers)
+
+    async def close(self) -> None:
+        await self.flush()
+
+        for reader in self.readers:
+            await reader.close()
+        self.readers = []
+
+        if self.writer is not None:
+            await self.writer.close()
+            self.writer = None
+
+    def wrap(self, connection: aiosqlite.Connection) -> aiosqlite.Connection:
+        return InstrumentedConnection(connection, self.slow_query_ms) if self.instrumented else connection
+
+    def reader(self) -> aiosqlite.Connection:
+        """Hands out the read-only connections round-robin."""
+        return next(self.next_reader)
+
+    @asynccontextmanager
+    async def snapshot(self) -> AsyncIterator[aiosqlite.Connection]:
+        """A read-only connection of its own, for long reads such as exports
+        that should not hold up the shared readers."""
+        reader = await aiosqlite.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True)
+        reader.row_factory = aiosqlite.Row
+        try:
+            await reader.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            await reader.execute("BEGIN")
+            yield self.wrap(reader)
+        finally:
+            await reader.close()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Runs the block as one write transaction on the writer connection,
+        committing on success and rolling back if it raises."""
+        waiting = time.perf_counter()
+        if self.group_commit_ms <= 0:
+            async with self.write_lock:
+                self.write_wait.observe(time.perf_counter() - waiting)
+                await self.writer.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self.writer
+                except BaseException:
+                    await self.writer.execute("ROLLBACK")
+                    self.rolled_back += 1
+                    raise
+                else:
+                    await self.commit()
+                    self.committed += 1
+                finally:
+                    clear_loaders()
+            return
+
+        async with self.write_lock:
+            self.write_wait.observe(time.perf_counter() - waiting)
+            if self.group is None:
+                await self.writer.execute("BEGIN IMMEDIATE")
+                self.group = asyncio.get_running_loop().create_future()
+                self.group_size = 0
+                asyncio.get_running_loop().call_later(
+                    self.group_commit_ms / 1000, lambda group=self.group: asyncio.ensure_future(self.flush(group))
+                )
+            group = self.group
+            await self.writer.execute("SAVEPOINT unit")
+            try:
+                yield self.writer
+            except BaseException:
+                await self.writer.execute("ROLLBACK TO unit")
+                await self.writer.execute("RELEASE unit")
+                self.rolled_back += 1
+                clear_loaders()
+                raise
+            await self.writer.execute("RELEASE unit")
+            self.group_size += 1
+            if self.group_size >= self.group_commit_max:
+                asyncio.ensure_future(self.flush(group))
+
+        try:
+            await asyncio.shield(group)
+        finally:
+            clear_loaders()
+
+    async def commit(self) -> None:
+        started = time.perf_counter()
+        await self.writer.execute("COMMIT")
+        self.commit_latency.observe(time.perf_counter() - started)
+
+    async def flush(self, group: asyncio.Future | None = None) -> None:
+        """Commits the open group, if it is still the one ``group`` refers to."""
+        async with self.write_lock:
+            if self.group is None or (group is not None and group is not self.group):
+                return
+            group, self.group = self.group, None
+            try:
+                await self.commit()
+            except Exception as ex:
+                await self.writer.execute("ROLLBACK")
+                self.rolled_back += self.group_size
+                group.set_exception(ex)
+            else:
+                self.committed += self.group_size
+                group.set_result(None)
+
+
+def migrate(path: Path, migrations_dir: Path = Path(__file__).parent / "migrations") -> List[str]:
+    """Applies pending migrations in file-name order.
+
+    Uses the same bookkeeping table as limigrations so its rollback command
+    keeps working, but does not rely on insertion time for ordering (every
+    file registered in the same second would otherwise run in arbitrary
+    order on a fresh database)."""
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute("CREATE TABLE IF NOT EXISTS migrations (file text, status text, created_at datetime)")
+    applied = {row[0] for row in c.execute("SELECT file FROM migrations WHERE status = 'up'")}
+    ran = []
+
+    try:
+        for migration in sorted(Path(migrations_dir).glob("*.py")):
+            if migration.name in applied:
+                continue
+
+            spec = importlib.util.spec_from_file_location(f"migrations.{migration.stem}", migration)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.Migration().up(conn, c)
+
+            c.execute("DELETE FROM migrations WHERE file = ?", [migration.name])
+            c.execute(
+                "INSERT INTO migrations VALUES (?, 'up', ?)", [migration.name, time.strftime("%Y-%m-%d %H:%M:%S")]
+            )
+            conn.commit()
+            ran.append(migration.name)
+    finally:
+        conn.close()
+
+    return ran
@@ -0,0 +1,117 @@
+"""Streaming bulk imports: the upload is read line by line and valid rows
+are written in large batches, so an import never holds the whole file."""
+import csv
+import json
+import sqlite3
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+BATCH_SIZE = 5000
+
+# Errors beyond this many are counted but not listed in the report.
+MAX_REPORTED_ERRORS = 1000
+
+
+async def read_records(request: web.Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yields ``(line number, record)`` from an NDJSON or CSV body, picked by
+    ``?format=`` or the Content-Type. CSV needs a header row and one record
+    per line. A line that cannot be parsed is yielded as the exception."""
+    format = request.query.get("format") or ("csv" if request.content_type == "text/csv" else "ndjson")
+    if format not in ("csv", "ndjson"):
+        raise ValueError(f"Unknown import format {format}!")
+
+    header: Optional[List[str]] = None
+    number = 0
+    async for raw in request.content:
+        number += 1
+        line = raw.decode("utf-8-sig" if number == 1 else "utf-8").strip()
+        if not line:
+            continue
+        try:
+            if format == "ndjson":
+                yield number, json.loads(line)
+            elif header is None:
+                header = [name.strip() for name in next(csv.reader([line]))]
+            else:
+                yield number, dict(zip(header, next(csv.reader([line]))))
+        except ValueError as ex:
+            yield number, ex
+
+
+class Report:
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, line: int, reason: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "reason": reason})
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "status": "ok" if not self.failed else "partial",
+            "entity": self.entity,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+async def write_batch(report: Report, write: Callable[[List[List[Any]]], Awaitable[None]],
+                      lines: List[int], batch: List[List[Any]]) -> None:
+    """Writes ``batch`` in one transaction. If the database rejects it, the
+    transaction has rolled back and the rows are written one by one, so only
+    the rows it rejects are reported as failed."""
+    try:
+        await write(batch)
+    except sqlite3.Error as ex:
+        if len(batch) == 1:
+            report.error(lines[0], f"not written: {ex}")
+            return
+    else:
+        report.imported += len(batch)
+        return
+
+    for line, row in zip(lines, batch):
+        try:
+            await write([row])
+        except sqlite3.Error as ex:
+            report.error(line, f"not written: {ex}")
+        else:
+            report.imported += 1
+
+
+async def run_import(request: web.Request, entity: str, validate: Callable[[Any], List[Any]],
+                     write: Callable[[List[List[Any]]], Awaitable[None]]) -> Report:
+    """Validates each record with ``validate`` (which returns the row to
+    insert or raises ValueError/KeyError) and hands valid rows to ``write``
+    in batches of BATCH_SIZE. Each batch is its own transaction, so an
+    import is not all-or-nothing: a row that fails validation or that the
+    database rejects is listed in the report and the rest are kept."""
+    report = Report(entity)
+    lines: List[int] = []
+    batch: List[List[Any]] = []
+
+    async for line, record in read_records(request):
+        if isinstance(record, Exception):
+            report.error(line, f"unreadable: {record}")
+            continue
+        try:
+            batch.append(validate(record))
+        except (KeyError, TypeError, ValueError) as ex:
+            report.error(line, f"missing field {ex}" if isinstance(ex, KeyError) else str(ex))
+            continue
+        lines.append(line)
+        if len(batch) >= BATCH_SIZE:
+            await write_batch(report, write, lines, batch)
+            lines, batch = [], []
+
+    if batch:
+        await write_batch(report, write, lines, batch)
+
+    return report
@@ -0,0 +1,184 @@
+"""Per-request SQL counts and timings.
+
+When enabled, the database connections are wrapped so every statement
+(and every fetch) is timed against the request it runs for. Each response
+gets a ``Server-Timing`` header, and statements or requests over the
+configured thresholds are logged with their SQL. When disabled nothing is
+wrapped and the middleware is not installed, so the only cost left is a
+context variable lookup per response body.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+import aiosqlite
+from aiohttp import web
+
+
+log = logging.getLogger(__name__)
+
+# Statements kept per request for the slow request log.
+MAX_RECORDED = 100
+
+T = TypeVar("T")
+
+
+class Timings:
+    __slots__ = ("statements", "db", "serialize", "recorded")
+
+    def __init__(self):
+        self.statements = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.recorded: List[Tuple[float, str, Any]] = []
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+
+def record(sql: Optional[str], parameters: Any, seconds: float, slow_query: float = float("inf")) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.db += seconds
+        if sql is not None:
+            timings.statements += 1
+            if len(timings.recorded) < MAX_RECORDED:
+                timings.recorded.append((seconds, sql, parameters))
+    if sql is not None and seconds >= slow_query:
+        log.warning("slow query (%.1f ms): %s %s", seconds * 1000, " ".join(sql.split()), shorten(parameters))
+
+
+def shorten(parameters: Any, limit: int = 200) -> str:
+    if parameters is None:
+        return ""
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor: aiosqlite.Cursor):
+        self.cursor = cursor
+
+    async def timed(self, method: str, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await getattr(self.cursor, method)(*args)
+        finally:
+            record(None, None, time.perf_counter() - started)
+
+    async def fetchone(self) -> Optional[aiosqlite.Row]:
+        return await self.timed("fetchone")
+
+    async def fetchmany(self, size: Optional[int] = None) -> Iterable[aiosqlite.Row]:
+        return await self.timed("fetchmany", *([size] if size is not None else []))
+
+    async def fetchall(self) -> Iterable[aiosqlite.Row]:
+        return await self.timed("fetchall")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.cursor, name)
+
+
+class Statement:
+    """What ``execute`` returns: awaitable, or usable with ``async with``
+    like aiosqlite's own result."""
+
+    def __init__(self, run: Callable[[], Awaitable[aiosqlite.Cursor]], sql: str, parameters: Any,
+                 slow_query: float):
+        self.run = run
+        self.sql = sql
+        self.parameters = parameters
+        self.slow_query = slow_query
+        self.cursor: Optional[InstrumentedCursor] = None
+
+    async def execute(self) -> InstrumentedCursor:
+        started = time.perf_counter()
+        try:
+            return InstrumentedCursor(await self.run())
+        finally:
+            record(self.sql, self.parameters, time.perf_counter() - started, self.slow_query)
+
+    def __await__(self):
+        return self.execute().__await__()
+
+    async def __aenter__(self) -> InstrumentedCursor:
+        self.cursor = await self.execute()
+        return self.cursor
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.cursor.close()
+
+
+class InstrumentedConnection:
+    """Times statements on an aiosqlite connection, logging those that take
+    ``slow_query_ms`` or longer; anything else passes straight through."""
+
+    def __init__(self, connection: aiosqlite.Connection, slow_query_ms: float = 100):
+        self.connection = connection
+        self.slow_query = slow_query_ms / 1000
+
+    def execute(self, sql: str, parameters: Any = None) -> Statement:
+        args = (sql,) if parameters is None else (sql, parameters)
+        return Statement(lambda: self.connection.execute(*args), sql, parameters, self.slow_query)
+
+    def executemany(self, sql: str, parameters: Iterable[Any]) -> Statement:
+        parameters = list(parameters)
+        return Statement(
+            lambda: self.connection.executemany(sql, parameters), sql, f"<{len(parameters)} rows>", self.slow_query
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+
+def serialize(encode: Callable[[Any], T], data: Any) -> T:
+    """``encode(data)``, timed as serialization when a request is being measured."""
+    timings = _current.get()
+    if timings is None:
+        return encode(data)
+    started = time.perf_counter()
+    try:
+        return encode(data)
+    finally:
+        timings.serialize += time.perf_counter() - started
+
+
+def instrument_middleware(slow_request_ms: float = 1000, server_timing: bool = True) \
+        -> Callable[[web.Request, Callable[[web.Request], Awaitable[web.StreamResponse]]],
+                    Awaitable[web.StreamResponse]]:
+    """Times each request; slow queries are logged by the connections
+    themselves (see InstrumentedConnection)."""
+    slow_request = slow_request_ms / 1000
+
+    @web.middleware
+    async def middleware(request: web.Request,
+                         handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> web.StreamResponse:
+        timings = Timings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await handler(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if server_timing and not response.prepared:
+            response.headers["Server-Timing"] = (
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.statements} queries", '
+                f"serialize;dur={timings.serialize * 1000:.2f}, "
+                f"handler;dur={total * 1000:.2f}"
+            )
+        if total >= slow_request:
+            log.warning(
+                "slow request (%.1f ms): %s %s, %d queries, %.1f ms in db, %.1f ms serializing%s",
+                total * 1000, request.method, request.path_qs, timings.statements, timings.db * 1000,
+                timings.serialize * 1000,
+                "".join(
+                    f"\n  {seconds * 1000:.1f} ms {' '.join(sql.split())} {shorten(parameters)}"
+                    for seconds, sql, parameters in sorted(timings.recorded, key=lambda r: -r[0])[:10]
+                )
+            )
+        return response
+
+    return middleware
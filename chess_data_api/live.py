@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, Optional, Set
+
+from aiohttp import web
+
+from .serialize import default_serializer
+
+
+# Seconds between comment lines sent to keep idle connections (and proxies) open.
+KEEPALIVE = 15
+
+# Messages a subscriber may fall behind by before it is disconnected; it can
+# reconnect and re-fetch the tournament.
+QUEUE_SIZE = 256
+
+
+class Hub:
+    """In-process fan-out of tournament events to server-sent event streams.
+
+    Each event is serialized once, with ``encode`` (the app's serializer),
+    and the same bytes are queued for every subscriber of the tournament,
+    so the cost of a change does not depend on how many screens are
+    watching it.
+
+    ``on_watch`` is told when a tournament gets its first viewer (True) or
+    loses its last one (False), so other workers know whether to send it
+    events."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, encode: Callable[[Any], bytes] = default_serializer.encode):
+        self.queue_size = queue_size
+        self.encode = encode
+        self.channels: Dict[int, Set[asyncio.Queue]] = {}
+        self.on_watch: Optional[Callable[[int, bool], None]] = None
+        self.ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, tournament_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        if tournament_id not in self.channels:
+            self.channels[tournament_id] = set()
+            if self.on_watch is not None:
+                self.on_watch(tournament_id, True)
+        self.channels[tournament_id].add(queue)
+        return queue
+
+    def unsubscribe(self, tournament_id: int, queue: asyncio.Queue) -> None:
+        queues = self.channels.get(tournament_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.channels[tournament_id]
+                if self.on_watch is not None:
+                    self.on_watch(tournament_id, False)
+
+    def watched(self, tournament_id: int) -> bool:
+        return bool(self.channels.get(tournament_id))
+
+    def publish(self, tournament_id: int, event: str, data: Any) -> None:
+        queues = self.channels.get(tournament_id)
+        if not queues:
+            return
+
+        message = f"id: {next(self.ids)}\nevent: {event}\ndata: ".encode() + self.encode(data) + b"\n\n"
+        self.published += 1
+        for queue in list(queues):
+            try:
+                queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # too slow to keep up: drop what is queued and tell it to go away
+                self.unsubscribe(tournament_id, queue)
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def disconnect(self, tournament_id: int) -> None:
+        """Ends the tournament's streams; viewers reconnect and re-fetch."""
+        for queue in list(self.channels.get(tournament_id, ())):
+            self.unsubscribe(tournament_id, queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    def close(self) -> None:
+        for tournament_id in list(self.channels):
+            self.disconnect(tournament_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self.channels),
+            "subscribers": sum(len(queues) for queues in self.channels.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+async def stream(request: web.Request, hub: Hub, tournament_id: int, hello: Any) -> web.StreamResponse:
+    """Sends ``hello`` and then every event published for the tournament
+    until the client goes away or the hub is closed."""
+    queue = hub.subscribe(tournament_id)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    try:
+        await response.prepare(request)
+        await response.write(b"event: hello\ndata: " + hub.encode(hello) + b"\n\n")
+        while True:
+            try:
+                message: Optional[bytes] = await asyncio.wait_for(queue.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                await response.write(b": keep-alive\n\n")
+                continue
+            if message is None:
+                break
+            await response.write(message)
+    except ConnectionResetError:
+        pass
+    finally:
+        hub.unsubscribe(tournament_id, queue)
+
+    return response
@@ -0,0 +1,116 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import aiosqlite
+from aiohttp import web
+
+
+BatchFn = Callable[[aiosqlite.Connection, List[int]], Awaitable[Dict[int, Any]]]
+
+_scope: ContextVar[Optional[Dict[Hashable, "Loader"]]] = ContextVar("loaders", default=None)
+
+
+class Loader:
+    """Coalesces the ids requested during one event-loop tick into a single
+    batch call and memoizes the results for the rest of the request."""
+
+    def __init__(self, db: aiosqlite.Connection, batch_fn: BatchFn, missing: Callable[[Any], BaseException]):
+        self.db = db
+        self.batch_fn = batch_fn
+        self.missing = missing
+        self.cache: Dict[int, asyncio.Future] = {}
+        self.queue: Dict[int, asyncio.Future] = {}
+
+    def load(self, id: Any) -> Awaitable[Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            key = int(id)
+        except (TypeError, ValueError):
+            future = loop.create_future()
+            future.set_exception(self.missing(id))
+            return future
+
+        future = self.cache.get(key)
+        if future is None:
+            future = loop.create_future()
+            self.cache[key] = future
+            self.queue[key] = future
+            if len(self.queue) == 1:
+                loop.call_soon(self.dispatch)
+
+        return future
+
+    async def load_many(self, ids: Iterable[Any]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(id) for id in ids)))
+
+    def prime(self, id: int, value: Any) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self.cache[int(id)] = future
+
+    def clear(self) -> None:
+        self.cache = {key: future for key, future in self.cache.items() if not future.done()}
+
+    def dispatch(self) -> None:
+        batch, self.queue = self.queue, {}
+        asyncio.ensure_future(self.run(batch))
+
+    async def run(self, batch: Dict[int, asyncio.Future]) -> None:
+        try:
+            loaded = await self.batch_fn(self.db, list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except BaseException as ex:
+            loaded = {}
+            for key, future in batch.items():
+                self.forget(key, future)
+                if not future.done():
+                    future.set_exception(ex)
+
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if key in loaded:
+                future.set_result(loaded[key])
+            else:
+                self.forget(key, future)
+                future.set_exception(self.missing(key))
+
+    def forget(self, key: int, future: asyncio.Future) -> None:
+        if self.cache.get(key) is future:
+            del self.cache[key]
+
+
+def get_loader(db: aiosqlite.Connection, batch_fn: BatchFn, missing: Callable[[Any], BaseException]) -> Optional[Loader]:
+    """Returns the request's loader for ``batch_fn`` on ``db``, or None outside of a request."""
+    scope = _scope.get()
+    if scope is None:
+        return None
+
+    key = (id(db), batch_fn)
+    loader = scope.get(key)
+    if loader is None:
+        loader = scope[key] = Loader(db, batch_fn, missing)
+
+    return loader
+
+
+def clear_loaders() -> None:
+    """Forgets everything memoized in this request, e.g. after a write."""
+    scope = _scope.get()
+    if scope is not None:
+        for loader in scope.values():
+            loader.clear()
+
+
+@web.middleware
+async def loader_middleware(request: web.Request, handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) \
+        -> web.StreamResponse:
+    token = _scope.set({})
+    try:
+        return await handler(request)
+    finally:
+        _scope.reset(token)
@@ -0,0 +1,191 @@
+"""Prometheus text-format metrics.
+
+Everything here is updated from the event loop only, so the counters are
+plain attributes and dict entries with no locking; a histogram observation
+is a bisect and three additions."""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+
+# Upper bounds in seconds, from a cached hit to a swiss pairing of a big field.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between the SELECT 1 probes that measure how long a statement
+# waits for a reader connection's worker thread.
+PROBE_INTERVAL = 5
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str = "") -> Iterator[str]:
+        prefix = labels + "," if labels else ""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {total}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class Metrics:
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight = 0
+        self.reader_wait = Histogram()
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        key = (method, route, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+
+def label(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_of(request: web.Request) -> str:
+    """The route template (``/games/{id}``), so ids do not each get a series."""
+    try:
+        return request.match_info.route.resource.canonical
+    except AttributeError:
+        return "unmatched"
+
+
+@web.middleware
+async def metrics_middleware(request: web.Request,
+                             handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> web.StreamResponse:
+    metrics: Optional[Metrics] = request.config_dict.get("METRICS")
+    if metrics is None:
+        return await handler(request)
+
+    metrics.in_flight += 1
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as ex:
+        status = ex.status
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.observe(request.method, route_of(request), status, time.perf_counter() - started)
+
+
+async def probe_readers(app: web.Application) -> None:
+    while True:
+        await asyncio.sleep(PROBE_INTERVAL)
+        for reader in app["DB"].readers:
+            started = time.perf_counter()
+            async with reader.execute("SELECT 1"):
+                pass
+            app["METRICS"].reader_wait.observe(time.perf_counter() - started)
+
+
+def exposition(app: web.Application) -> str:
+    metrics: Metrics = app["METRICS"]
+    db = app["DB"]
+    lines: List[str] = []
+
+    def family(name: str, type: str, help: str) -> None:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {type}")
+
+    family("http_request_duration_seconds", "histogram", "Time to handle a request, by route.")
+    for (method, route), histogram in sorted(metrics.latency.items()):
+        lines.extend(histogram.samples("http_request_duration_seconds",
+                                       f'method="{label(method)}",route="{label(route)}"'))
+
+    family("http_responses_total", "counter", "Responses sent, by route and status.")
+    for (method, route, status), count in sorted(metrics.responses.items()):
+        lines.append(f'http_responses_total{{method="{label(method)}",route="{label(route)}",status="{status}"}} {count}')
+
+    family("http_requests_in_flight", "gauge", "Requests being handled, including open event streams.")
+    lines.append(f"http_requests_in_flight {metrics.in_flight}")
+
+    family("db_reader_wait_seconds", "histogram", "Round trip of a SELECT 1 probe on each reader connection.")
+    lines.extend(metrics.reader_wait.samples("db_reader_wait_seconds"))
+
+    family("db_write_wait_seconds", "histogram", "Time a write transaction waited for the writer connection.")
+    lines.extend(db.write_wait.samples("db_write_wait_seconds"))
+
+    family("db_commit_seconds", "histogram", "Time spent in COMMIT.")
+    lines.extend(db.commit_latency.samples("db_commit_seconds"))
+
+    family("db_transactions_total", "counter", "Write transactions, by outcome.")
+    lines.append(f'db_transactions_total{{outcome="committed"}} {db.committed}')
+    lines.append(f'db_transactions_total{{outcome="rolled_back"}} {db.rolled_back}')
+
+    cache = app.get("CACHE")
+    if cache is not None:
+        stats = cache.stats()
+        for name, type, help in (
+            ("hits", "counter", "Responses served from the response cache."),
+            ("misses", "counter", "Cacheable responses that had to be built."),
+            ("coalesced", "counter", "Misses that waited for an identical build instead of starting one."),
+            ("evictions", "counter", "Entries evicted to stay under the cache limits."),
+            ("invalidations", "counter", "Entries dropped by writes."),
+            ("hit_ratio", "gauge", "hits / (hits + misses) since start."),
+            ("entries", "gauge", "Entries in the response cache."),
+            ("bytes", "gauge", "Bytes held by the response cache."),
+        ):
+            family(f"cache_{name}" + ("_total" if type == "counter" else ""), type, help)
+            lines.append(f"cache_{name}" + ("_total" if type == "counter" else "") + f" {stats[name]}")
+
+    serializer = app.get("SERIALIZER")
+    if serializer is not None:
+        stats = serializer.stats()
+        family("serializer_fragment_hits_total", "counter", "Documents spliced in from already encoded bytes.")
+        lines.append(f"serializer_fragment_hits_total {stats['hits']}")
+        family("serializer_fragment_misses_total", "counter", "Versioned documents that had to be encoded.")
+        lines.append(f"serializer_fragment_misses_total {stats['misses']}")
+        family("serializer_fragments", "gauge", "Encoded documents kept for reuse.")
+        lines.append(f"serializer_fragments {stats['fragments']}")
+
+    compression = app.get("COMPRESSION")
+    if compression is not None:
+        stats = compression.stats()
+        family("compression_bytes_in_total", "counter", "Response bytes before compression.")
+        for encoding, size in stats["bytes_in"].items():
+            lines.append(f'compression_bytes_in_total{{encoding="{encoding}"}} {size}')
+        family("compression_bytes_out_total", "counter", "Response bytes sent after compression.")
+        for encoding, size in stats["bytes_out"].items():
+            lines.append(f'compression_bytes_out_total{{encoding="{encoding}"}} {size}')
+        family("compression_cache_hits_total", "counter", "Bodies sent already compressed from an earlier request.")
+        lines.append(f"compression_cache_hits_total {stats['cache_hits']}")
+        family("compression_cache_bytes", "gauge", "Bytes held by the compressed body cache.")
+        lines.append(f"compression_cache_bytes {stats['cached_bytes']}")
+
+    live = app.get("LIVE")
+    if live is not None:
+        stats = live.stats()
+        family("live_subscribers", "gauge", "Open event streams.")
+        lines.append(f"live_subscribers {stats['subscribers']}")
+        family("live_events_dropped_total", "counter", "Subscribers disconnected for falling behind.")
+        lines.append(f"live_events_dropped_total {stats['dropped']}")
+
+    return "\n".join(lines) + "\n"
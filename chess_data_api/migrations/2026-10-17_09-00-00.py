@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Per-tournament standings, maintained as results come in."""
+from limigrations.migration import BaseMigration
+
+
+class Migration(BaseMigration):
+    """Adds tournament_standings and fills it from the games played so far."""
+
+    def up(self, conn, c):
+        """Run when calling 'migrate'."""
+        c.execute(
+            """CREATE TABLE tournament_standings (
+            tournament_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            byes INTEGER NOT NULL DEFAULT 0,
+            score REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (tournament_id, player_id),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE,
+            FOREIGN KEY (player_id) REFERENCES players(id)
+            ) WITHOUT ROWID
+        """
+        )
+        c.execute(
+            """INSERT INTO tournament_standings (tournament_id, player_id, wins, losses, draws, score)
+            SELECT tournament_id, player_id, wins, played - wins - draws, draws, wins + 0.5 * draws
+            FROM (
+                SELECT tournament_id, player_id,
+                       COUNT(*) AS played,
+                       SUM(CAST(result AS INTEGER) = player_id) AS wins,
+                       SUM(result = 'draw') AS draws
+                FROM (
+                    SELECT tournament_id, white AS player_id, result FROM games WHERE result IS NOT NULL
+                    UNION ALL
+                    SELECT tournament_id, black AS player_id, result FROM games WHERE result IS NOT NULL
+                )
+                GROUP BY tournament_id, player_id
+            )
+        """
+        )
+        c.execute(
+            """INSERT OR IGNORE INTO tournament_standings (tournament_id, player_id)
+            SELECT tournament_id, player_id FROM enrollment
+        """
+        )
+        conn.commit()
+
+    def down(self, conn, c):
+        """Run when calling 'rollback'."""
+        c.execute("""DROP TABLE tournament_standings""")
+        conn.commit()
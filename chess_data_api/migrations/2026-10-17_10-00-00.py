@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Indexes for the lookups the API runs on every request."""
+from limigrations.migration import BaseMigration
+
+
+INDEXES = {
+    # team members and leaderboards
+    "players_team_index": "players(team)",
+    # enrolled players and team lineups; carries every column those queries read
+    "enrollment_tournament_index": "enrollment(tournament_id, player_id, team_id)",
+    # a tournament's games in round/board order, with pairing history covered
+    "games_tournament_index": "games(tournament_id, round, board, white, black)",
+    # a player's games
+    "games_white_index": "games(white, tournament_id)",
+    "games_black_index": "games(black, tournament_id)",
+    # standings in rank order
+    "tournament_standings_rank_index":
+        "tournament_standings(tournament_id, score DESC, wins DESC, player_id, losses, draws, byes)",
+}
+
+
+class Migration(BaseMigration):
+    """Adds secondary indexes shaped around the queries in main.py; see
+    query_plans.py for the check that keeps them in use."""
+
+    def up(self, conn, c):
+        """Run when calling 'migrate'."""
+        for name, target in INDEXES.items():
+            c.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        c.execute("ANALYZE")
+        conn.commit()
+
+    def down(self, conn, c):
+        """Run when calling 'rollback'."""
+        for name in INDEXES:
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Row versions for conditional GETs."""
+from limigrations.migration import BaseMigration
+
+
+VERSIONED = ["tournaments", "games", "players", "teams", "officials"]
+
+# Documents that list other rows (a tournament's games, a team's members)
+# also change when a row joins or leaves them, so those writes bump the
+# parent's version too. Rows without a version of their own (enrollment,
+# standings) bump the parent on every change.
+PARENT_TRIGGERS = {
+    "games_tournament": ("games", "tournaments", "tournament_id"),
+    "enrollment_tournament": ("enrollment", "tournaments", "tournament_id"),
+    "standings_tournament": ("tournament_standings", "tournaments", "tournament_id"),
+    "players_team": ("players", "teams", "team"),
+}
+
+
+class Migration(BaseMigration):
+    """Adds a version column to every entity table, bumped by triggers on
+    each write, so an ETag can be computed from versions alone."""
+
+    def up(self, conn, c):
+        """Run when calling 'migrate'."""
+        for table in VERSIONED:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            c.execute(
+                f"""CREATE TRIGGER {table}_version AFTER UPDATE ON {table}
+                WHEN NEW.version = OLD.version
+                BEGIN
+                    UPDATE {table} SET version = OLD.version + 1 WHERE id = NEW.id;
+                END"""
+            )
+
+        for name, (child, parent, column) in PARENT_TRIGGERS.items():
+            bump = f"UPDATE {parent} SET version = version + 1 WHERE id"
+            c.execute(
+                f"""CREATE TRIGGER {name}_insert AFTER INSERT ON {child}
+                BEGIN {bump} = NEW.{column}; END"""
+            )
+            c.execute(
+                f"""CREATE TRIGGER {name}_delete AFTER DELETE ON {child}
+                BEGIN {bump} = OLD.{column}; END"""
+            )
+            moved = f"WHEN OLD.{column} IS NOT NEW.{column}" if child in VERSIONED else ""
+            c.execute(
+                f"""CREATE TRIGGER {name}_update AFTER UPDATE ON {child} {moved}
+                BEGIN {bump} IN (OLD.{column}, NEW.{column}); END"""
+            )
+        conn.commit()
+
+    def down(self, conn, c):
+        """Run when calling 'rollback'."""
+        for name in PARENT_TRIGGERS:
+            for event in ("insert", "delete", "update"):
+                c.execute(f"DROP TRIGGER IF EXISTS {name}_{event}")
+        for table in VERSIONED:
+            c.execute(f"DROP TRIGGER IF EXISTS {table}_version")
+            c.execute(f"ALTER TABLE {table} DROP COLUMN version")
+        conn.commit()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Indexes for keyset-paginated lists."""
+from limigrations.migration import BaseMigration
+
+
+# SQLite appends the rowid to every index, so an index on the filter column
+# alone returns the matching rows already in id order.
+INDEXES = {
+    "games_tournament_id_index": "games(tournament_id)",
+    "enrollment_tournament_id_index": "enrollment(tournament_id)",
+    "tournaments_official_index": "tournaments(official)",
+}
+
+# The player-game indexes drop their second column so a player's games come
+# out in id order; nothing filters on white/black plus tournament.
+REPLACED = {
+    "games_white_index": ("games(white)", "games(white, tournament_id)"),
+    "games_black_index": ("games(black)", "games(black, tournament_id)"),
+}
+
+
+class Migration(BaseMigration):
+    """Adds indexes that let the list endpoints walk ids within a filter."""
+
+    def up(self, conn, c):
+        """Run when calling 'migrate'."""
+        for name, (target, _) in REPLACED.items():
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+            c.execute(f"CREATE INDEX {name} ON {target}")
+        for name, target in INDEXES.items():
+            c.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        c.execute("ANALYZE")
+        conn.commit()
+
+    def down(self, conn, c):
+        """Run when calling 'rollback'."""
+        for name in INDEXES:
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+        for name, (_, previous) in REPLACED.items():
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+            c.execute(f"CREATE INDEX {name} ON {previous}")
+        conn.commit()
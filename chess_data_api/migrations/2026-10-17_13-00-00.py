@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Tournament versions that move whenever a game is re-pointed."""
+from limigrations.migration import BaseMigration
+
+
+# A tournament's ETag sums the versions of its games' players and officials.
+# Re-pointing a game (official X -> Y -> X) changes which rows that sum
+# covers, and can bring it back to a value a client already holds, so those
+# writes bump the tournament's own version as well.
+DOCUMENT_COLUMNS = ["tournament_id", "white", "black", "official", "result"]
+
+
+class Migration(BaseMigration):
+    """Widens games_tournament_update to fire on every change to what a
+    game references, not only on a move to another tournament."""
+
+    def up(self, conn, c):
+        """Run when calling 'migrate'."""
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in DOCUMENT_COLUMNS)
+        c.execute("DROP TRIGGER IF EXISTS games_tournament_update")
+        c.execute(
+            f"""CREATE TRIGGER games_tournament_update AFTER UPDATE ON games WHEN {changed}
+            BEGIN UPDATE tournaments SET version = version + 1 WHERE id IN (OLD.tournament_id, NEW.tournament_id); END"""
+        )
+        conn.commit()
+
+    def down(self, conn, c):
+        """Run when calling 'rollback'."""
+        c.execute("DROP TRIGGER IF EXISTS games_tournament_update")
+        c.execute(
+            """CREATE TRIGGER games_tournament_update AFTER UPDATE ON games
+            WHEN OLD.tournament_id IS NOT NEW.tournament_id
+            BEGIN UPDATE tournaments SET version = version + 1 WHERE id IN (OLD.tournament_id, NEW.tournament_id); END"""
+        )
+        conn.commit()
@@ -0,0 +1,362 @@
+"""Pairing engines for organizing a tournament round.
+
+An engine takes the field as a list of ``Entrant`` objects, ordered by
+rank (best first), and returns a ``Pairing``. Engines only look at what
+they are given, so they can be run and benchmarked without a database::
+
+    python -m chess_data_api.pairing --players 1000 --rounds 7
+"""
+import argparse
+import itertools
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .matching import max_weight_matching
+
+
+WHITE = "w"
+BLACK = "b"
+
+# Upper bound on backtracking steps spent on one score bracket before its
+# lowest players float down; keeps pathological brackets from stalling the
+# fast path (the matching in pair_field settles whatever reaches the bottom).
+BRACKET_BUDGET = 20000
+
+
+class History:
+    """Head-to-head and colour record of one player in one tournament."""
+
+    __slots__ = ("opponents", "colours")
+
+    def __init__(self):
+        self.opponents: Set[int] = set()
+        self.colours: List[str] = []
+
+
+class Entrant:
+    __slots__ = ("id", "score", "opponents", "colours", "had_bye")
+
+    def __init__(self, id: int, score: float, history: Optional[History] = None, had_bye: bool = False):
+        self.id = id
+        self.score = score
+        self.opponents = history.opponents if history else set()
+        self.colours = history.colours if history else []
+        self.had_bye = had_bye
+
+    @property
+    def colour_difference(self) -> int:
+        return self.colours.count(WHITE) - self.colours.count(BLACK)
+
+    def colour_preference(self) -> Tuple[Optional[str], int]:
+        """Returns the preferred colour and its strength: 3 absolute, 2 strong, 1 mild, 0 none."""
+        difference = self.colour_difference
+        if difference < -1 or self.colours[-2:] == [BLACK, BLACK]:
+            return WHITE, 3
+        if difference > 1 or self.colours[-2:] == [WHITE, WHITE]:
+            return BLACK, 3
+        if difference == -1:
+            return WHITE, 2
+        if difference == 1:
+            return BLACK, 2
+        if self.colours:
+            return (WHITE if self.colours[-1] == BLACK else BLACK), 1
+        return None, 0
+
+
+class Pairing:
+    def __init__(self, pairs: List[Tuple[int, int]], bye: Optional[int] = None):
+        # (white, black) in board order
+        self.pairs = pairs
+        self.bye = bye
+
+
+def build_history(games: Iterable[Tuple[int, int, int]]) -> Dict[int, History]:
+    """Builds the head-to-head and colour index from (round, white, black)
+    rows. Rows must be ordered by round so colour sequences are in order."""
+    history: Dict[int, History] = {}
+
+    for _, white, black in games:
+        white_history = history.get(white) or history.setdefault(white, History())
+        black_history = history.get(black) or history.setdefault(black, History())
+        white_history.opponents.add(black)
+        white_history.colours.append(WHITE)
+        black_history.opponents.add(white)
+        black_history.colours.append(BLACK)
+
+    return history
+
+
+def compatible(a: Entrant, b: Entrant) -> bool:
+    if b.id in a.opponents:
+        return False
+
+    colour_a, strength_a = a.colour_preference()
+    colour_b, strength_b = b.colour_preference()
+    return not (strength_a == 3 and strength_b == 3 and colour_a == colour_b)
+
+
+def allocate_colours(higher: Entrant, lower: Entrant, board: int) -> Tuple[int, int]:
+    colour_high, strength_high = higher.colour_preference()
+    colour_low, strength_low = lower.colour_preference()
+
+    if colour_high is None and colour_low is None:
+        # first round: alternate colours down the boards
+        colour = WHITE if board % 2 == 0 else BLACK
+    elif colour_low is None or (colour_high is not None and colour_high != colour_low):
+        colour = colour_high
+    elif colour_high is None:
+        colour = BLACK if colour_low == WHITE else WHITE
+    elif strength_high != strength_low:
+        colour = colour_high if strength_high > strength_low else (BLACK if colour_low == WHITE else WHITE)
+    elif abs(higher.colour_difference) != abs(lower.colour_difference):
+        stronger_high = abs(higher.colour_difference) > abs(lower.colour_difference)
+        colour = colour_high if stronger_high else (BLACK if colour_low == WHITE else WHITE)
+    else:
+        colour = colour_high
+
+    return (higher.id, lower.id) if colour == WHITE else (lower.id, higher.id)
+
+
+def pair_bracket(players: List[Entrant], budget: int = BRACKET_BUDGET) -> Optional[List[Tuple[Entrant, Entrant]]]:
+    """Pairs an even-sized bracket Dutch-style: the top half meets the bottom
+    half in order, with transpositions found by backtracking when that would
+    mean a rematch or a colour clash. Returns None if it cannot be done
+    within ``budget`` steps."""
+    if not players:
+        return []
+
+    # Each frame is the unpaired players plus the candidate indices still to try
+    # for the first of them. Preferring the player half-way down the list gives
+    # S1[0]-S2[0], then S1[1]-S2[1] and so on.
+    def candidates(unpaired: List[Entrant]) -> Iterable[int]:
+        start = len(unpaired) // 2
+        return itertools.chain(range(start, len(unpaired)), range(start - 1, 0, -1))
+
+    stack = [(players, iter(candidates(players)))]
+    pairs: List[Tuple[Entrant, Entrant]] = []
+    steps = 0
+
+    while stack:
+        unpaired, options = stack[-1]
+        first = unpaired[0]
+
+        for index in options:
+            steps += 1
+            if steps > budget:
+                return None
+            if compatible(first, unpaired[index]):
+                pairs.append((first, unpaired[index]))
+                rest = unpaired[1:index] + unpaired[index + 1:]
+                if not rest:
+                    return pairs
+                stack.append((rest, iter(candidates(rest))))
+                break
+        else:
+            stack.pop()
+            if pairs:
+                pairs.pop()
+
+    return None
+
+
+def pair_with_floaters(players: List[Entrant]) -> Tuple[List[Tuple[Entrant, Entrant]], List[Entrant]]:
+    """Pairs as much of the bracket as possible, floating the lowest-ranked
+    players that cannot be paired down to the next bracket."""
+    for floaters in range(len(players) % 2, len(players) + 1, 2):
+        kept = players[:len(players) - floaters]
+        pairs = pair_bracket(kept)
+        if pairs is not None:
+            return pairs, players[len(players) - floaters:]
+
+    return [], players
+
+
+def choose_bye(ranked: List[Entrant]) -> Optional[Entrant]:
+    if len(ranked) % 2 == 0:
+        return None
+    for entrant in reversed(ranked):
+        if not entrant.had_bye:
+            return entrant
+    return ranked[-1]
+
+
+def pair_brackets(ranked: List[Entrant]) -> Tuple[List[Tuple[Entrant, Entrant]], Optional[Entrant]]:
+    """Dutch pairing bracket by bracket, floating down whoever cannot be
+    paired. Whatever is left at the bottom is settled by ``pair_field`` over
+    the lowest brackets plus the floaters, widening the pool (at least
+    doubling it each time) only while the matching still needs a rematch,
+    so the cubic matching rarely sees more than the tail of the field."""
+    ranked = list(ranked)
+    rank = {entrant.id: index for index, entrant in enumerate(ranked)}
+    bye = choose_bye(ranked)
+    if bye is not None:
+        ranked.remove(bye)
+
+    brackets = [list(group) for _, group in itertools.groupby(ranked, key=lambda e: e.score)]
+    paired: List[List[Tuple[Entrant, Entrant]]] = []
+    floaters: List[Entrant] = []
+
+    for bracket in brackets:
+        pairs, floaters = pair_with_floaters(floaters + bracket)
+        paired.append(pairs)
+
+    pool = floaters
+    while floaters:
+        target = 2 * len(pool)
+        pool = list(pool)
+        while paired and len(pool) < target:
+            pool.extend(player for pair in paired.pop() for player in pair)
+        if not paired:
+            # the whole field, so the bye is open to the matching as well
+            if bye is not None:
+                pool.append(bye)
+            pool.sort(key=lambda e: rank[e.id])
+            pairs, bye = pair_field(pool)
+            paired.append(pairs)
+            break
+        pool.sort(key=lambda e: rank[e.id])
+        pairs, _ = pair_field(pool)
+        if not any(b.id in a.opponents for a, b in pairs):
+            paired.append(pairs)
+            floaters = []
+
+    return [pair for bracket in paired for pair in bracket], bye
+
+
+def pair_field(ranked: List[Entrant]) -> Tuple[List[Tuple[Entrant, Entrant]], Optional[Entrant]]:
+    """Pairs ``ranked`` (and picks the bye if it is odd) with a maximum-weight
+    matching in O(n^3). Everyone is paired; among those pairings it makes, in order of
+    priority, the fewest rematches, the fewest repeated byes, the fewest
+    clashes of absolute colour preferences, the smallest score differences,
+    and then follows the Dutch top-half against bottom-half order."""
+    count = len(ranked)
+    rank = {entrant.id: index for index, entrant in enumerate(ranked)}
+    groups: Dict[float, List[int]] = {}
+    for index, entrant in enumerate(ranked):
+        groups.setdefault(entrant.score, []).append(index)
+    # position within the score group and half the group's size
+    position = {index: (group.index(index), len(group) // 2) for group in groups.values() for index in group}
+
+    # (rematch, repeated bye, colour clash, score difference, order) penalties,
+    # most important first
+    penalties: List[Tuple[int, int, Tuple[int, int, int, int, int]]] = []
+    for a, b in itertools.combinations(range(count), 2):
+        first, second = ranked[a], ranked[b]
+        colour_a, strength_a = first.colour_preference()
+        colour_b, strength_b = second.colour_preference()
+        (offset_a, half), (offset_b, _) = position[a], position[b]
+        penalties.append((a, b, (
+            int(second.id in first.opponents),
+            0,
+            int(strength_a == 3 and strength_b == 3 and colour_a == colour_b),
+            int(round(2 * abs(first.score - second.score))) ** 2,
+            abs(offset_b - offset_a - half) if first.score == second.score else 0,
+        )))
+    if count % 2:
+        # an extra vertex stands in for the bye, preferably the lowest-ranked
+        # player who has not had one
+        penalties.extend(
+            (index, count, (0, int(entrant.had_bye), 0, 0, count - 1 - rank[entrant.id]))
+            for index, entrant in enumerate(ranked)
+        )
+
+    # Fold the penalties into one integer per edge, each level weighing more
+    # than every lower level can add up to over a whole pairing.
+    levels = len(penalties[0][2]) if penalties else 0
+    pairs_per_matching = count // 2 + 1
+    bases = []
+    for level in range(levels):
+        bases.append(max(penalty[level] for _, _, penalty in penalties) * pairs_per_matching + 1)
+    weights = []
+    for a, b, penalty in penalties:
+        total = 0
+        for level in range(levels):
+            total = total * bases[level] + penalty[level]
+        weights.append((a, b, total))
+    top = max((total for _, _, total in weights), default=0) + 1
+
+    mate = max_weight_matching([(a, b, top - total) for a, b, total in weights], maxcardinality=True)
+    pairs = [(ranked[a], ranked[b]) for a, b in enumerate(mate[:count]) if a < b < count]
+    bye = next((ranked[a] for a, b in enumerate(mate[:count]) if b == count), None)
+    return pairs, bye
+
+
+def swiss(entrants: List[Entrant]) -> Pairing:
+    """Dutch-system Swiss pairing with score groups, rematch avoidance and
+    colour alternation.
+
+    Brackets are paired top-half against bottom-half first, which is cheap
+    and settles almost every round of a large event. When that leaves the
+    bottom of the field unpaired, a maximum-weight matching settles it,
+    taking in more of the field only while it cannot avoid a rematch, so a
+    rematch only happens when no pairing without one exists (and absolute
+    colour preferences give way first)."""
+    ranked = sorted(entrants, key=lambda e: -e.score)
+    pairs, bye = pair_brackets(ranked)
+
+    pairs.sort(key=lambda pair: -max(pair[0].score, pair[1].score))
+    return Pairing(
+        [allocate_colours(a, b, board) for board, (a, b) in enumerate(pairs)],
+        bye.id if bye is not None else None
+    )
+
+
+def adjacent(entrants: List[Entrant]) -> Pairing:
+    """Pairs neighbours in the standings, higher-ranked player with white."""
+    ranked = sorted(entrants, key=lambda e: -e.score)
+    pairs = [(ranked[i].id, ranked[i + 1].id) for i in range(0, len(ranked) - 1, 2)]
+    return Pairing(pairs, ranked[-1].id if len(ranked) % 2 else None)
+
+
+ENGINES: Dict[str, Callable[[List[Entrant]], Pairing]] = {
+    "swiss": swiss,
+    "adjacent": adjacent,
+}
+
+
+def benchmark(players: int, rounds: int, engine: str = "swiss", seed: int = 0) -> List[float]:
+    """Plays out a random event and returns the time taken to pair each round."""
+    rng = random.Random(seed)
+    games: List[Tuple[int, int, int]] = []
+    scores = {id: 0.0 for id in range(players)}
+    byes: Set[int] = set()
+    timings = []
+
+    for round in range(1, rounds + 1):
+        history = build_history(games)
+        entrants = [Entrant(id, score, history.get(id), id in byes) for id, score in scores.items()]
+        rng.shuffle(entrants)
+        entrants.sort(key=lambda e: -e.score)
+
+        started = time.perf_counter()
+        pairing = ENGINES[engine](entrants)
+        timings.append(time.perf_counter() - started)
+
+        for white, black in pairing.pairs:
+            games.append((round, white, black))
+            outcome = rng.random()
+            if outcome < .45:
+                scores[white] += 1
+            elif outcome < .9:
+                scores[black] += 1
+            else:
+                scores[white] += .5
+                scores[black] += .5
+        if pairing.bye is not None:
+            scores[pairing.bye] += 1
+            byes.add(pairing.bye)
+
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a pairing engine on a simulated tournament.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="swiss")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for round, seconds in enumerate(benchmark(args.players, args.rounds, args.engine, args.seed), start=1):
+        print(f"round {round}: {seconds * 1000:.1f} ms")
@@ -0,0 +1,120 @@
+"""SQL for the per-request read paths.
+
+The handlers in app.py run these strings, and query_plans.py checks the
+same strings for table scans, so the check covers exactly what is served.
+Queries whose shape depends on the request (id lists, page filters) are
+built by the functions below from the same pieces.
+"""
+from typing import Iterable, List
+
+
+PLAYER = "SELECT * FROM players WHERE id = ?"
+TEAM_MEMBERS = "SELECT * FROM players WHERE team = ?"
+TEAM = "SELECT * FROM teams WHERE id = ?"
+TOURNAMENT = "SELECT * FROM tournaments WHERE id = ?"
+GAME = "SELECT * FROM games WHERE id = ?"
+GAME_TOURNAMENT = "SELECT tournament_id FROM games WHERE id = ?"
+TOURNAMENT_GAMES = "SELECT * FROM games WHERE tournament_id = ? ORDER BY round, board"
+ROUND_GAMES = "SELECT * FROM games WHERE tournament_id = ? AND round = ? ORDER BY board"
+ROUND_RESULTS = "SELECT id, board, white, black, official, result FROM games WHERE tournament_id = ? AND round = ?"
+PAIRING_HISTORY = "SELECT round, white, black FROM games WHERE tournament_id = ? ORDER BY round, board"
+ENROLLMENT = "SELECT * FROM enrollment WHERE id = ?"
+ENROLLED_PLAYERS = "SELECT player_id FROM enrollment WHERE tournament_id = ? GROUP BY player_id ORDER BY MIN(id)"
+LINEUPS = """SELECT DISTINCT e.team_id, e.player_id, p.grade, p.name FROM enrollment e
+    JOIN players p ON p.id = e.player_id
+    WHERE e.tournament_id = ?
+    ORDER BY e.team_id, CAST(p.grade AS INTEGER) DESC, p.name"""
+PLAYER_STANDINGS = "SELECT * FROM tournament_standings WHERE tournament_id = ? AND player_id = ?"
+TOURNAMENT_STANDINGS = \
+    "SELECT * FROM tournament_standings WHERE tournament_id = ? ORDER BY score DESC, wins DESC, player_id"
+ENROLLED_STANDINGS = """SELECT DISTINCT e.player_id, s.wins, s.losses, s.draws, s.byes, s.score FROM enrollment e
+    LEFT JOIN tournament_standings s ON s.tournament_id = e.tournament_id AND s.player_id = e.player_id
+    WHERE e.tournament_id = ?
+    ORDER BY COALESCE(s.score, 0) DESC, COALESCE(s.wins, 0) DESC, e.player_id"""
+DELETE_GAME = "DELETE FROM games WHERE id = ?"
+DELETE_PLAYER = "DELETE FROM players WHERE id = ?"
+
+# Versions of everything a document embeds, for its ETag (see
+# app.fetch_versions).
+TOURNAMENT_VERSIONS = """SELECT t.version,
+       (SELECT version FROM officials WHERE id = t.official),
+       (SELECT total(g.version) + total(w.version) + total(b.version) + total(o.version) FROM games g
+        LEFT JOIN players w ON w.id = g.white
+        LEFT JOIN players b ON b.id = g.black
+        LEFT JOIN officials o ON o.id = g.official
+        WHERE g.tournament_id = t.id)
+    FROM tournaments t WHERE t.id = ?"""
+STANDINGS_VERSIONS = "SELECT version FROM tournaments WHERE id = ?"
+GAME_VERSIONS = """SELECT g.version, t.version, w.version, b.version, o.version FROM games g
+    LEFT JOIN tournaments t ON t.id = g.tournament_id
+    LEFT JOIN players w ON w.id = g.white
+    LEFT JOIN players b ON b.id = g.black
+    LEFT JOIN officials o ON o.id = g.official
+    WHERE g.id = ?"""
+TEAM_VERSIONS = "SELECT version, (SELECT total(version) FROM players WHERE team = teams.id) FROM teams WHERE id = ?"
+PLAYER_VERSIONS = """SELECT p.version, t.version, (SELECT total(version) FROM players WHERE team = p.team)
+    FROM players p
+    LEFT JOIN teams t ON t.id = p.team
+    WHERE p.id = ?"""
+OFFICIAL_VERSIONS = "SELECT version FROM officials WHERE id = ?"
+
+
+def rows_by_ids(table: str, count: int) -> str:
+    return f"SELECT * FROM {table} WHERE id IN ({', '.join('?' * count)})"
+
+
+def standings_of(count: int) -> str:
+    return f"SELECT * FROM tournament_standings WHERE tournament_id = ? AND player_id IN ({', '.join('?' * count)})"
+
+
+def page(table: str, columns: Iterable[str], conditions: Iterable[str] = (), after: bool = False) -> str:
+    """One keyset page of ``table`` in id order, filtered on ``columns``;
+    the parameters are the filter values, then the cursor (with ``after``)
+    and the limit."""
+    where = [f"{column} = ?" for column in columns] + list(conditions) + (["id > ?"] if after else [])
+    return f"SELECT * FROM {table} {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id LIMIT ?"
+
+
+def player_games_page(columns: Iterable[str], after: bool = False) -> str:
+    """One keyset walk per colour, merged; an OR across white and black
+    could not use either index. The parameters are the player, the filter
+    values, the cursor (with ``after``) and the limit, once per colour, and
+    then the limit again."""
+    where = "".join(f" AND {column} = ?" for column in columns) + (" AND id > ?" if after else "")
+    return f"""SELECT * FROM (SELECT * FROM games WHERE white = ?{where} ORDER BY id LIMIT ?)
+    UNION ALL
+    SELECT * FROM (SELECT * FROM games WHERE black = ?{where} ORDER BY id LIMIT ?)
+    ORDER BY id LIMIT ?"""
+
+
+def rebuild_standings(scope: str) -> List[str]:
+    """Recomputes standings rows matching ``scope`` (a condition on
+    ``tournament_id``) from the games table, keeping the bye counts."""
+    return [
+        f"UPDATE tournament_standings SET wins = 0, losses = 0, draws = 0, score = byes WHERE {scope}",
+        "INSERT OR IGNORE INTO tournament_standings (tournament_id, player_id) "
+        f"SELECT tournament_id, player_id FROM enrollment WHERE {scope}",
+        f"""INSERT INTO tournament_standings (tournament_id, player_id, wins, losses, draws, score)
+        SELECT * FROM (
+            SELECT tournament_id, player_id, wins, played - wins - draws, draws, wins + 0.5 * draws
+            FROM (
+                SELECT tournament_id, player_id,
+                       COUNT(*) AS played,
+                       SUM(CAST(result AS INTEGER) = player_id) AS wins,
+                       SUM(result = 'draw') AS draws
+                FROM (
+                    SELECT tournament_id, white AS player_id, result FROM games
+                    WHERE {scope} AND result IS NOT NULL
+                    UNION ALL
+                    SELECT tournament_id, black AS player_id, result FROM games
+                    WHERE {scope} AND result IS NOT NULL
+                )
+                GROUP BY tournament_id, player_id
+            )
+        ) WHERE true
+        ON CONFLICT (tournament_id, player_id) DO UPDATE SET
+            wins = excluded.wins,
+            losses = excluded.losses,
+            draws = excluded.draws,
+            score = byes + excluded.score""",
+    ]
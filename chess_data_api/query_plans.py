@@ -0,0 +1,108 @@
+"""Checks that the hot queries in app.py are answered from an index.
+
+Builds a scratch database from the migrations, runs EXPLAIN QUERY PLAN
+over each query shape below and exits non-zero if any of them scans a
+table::
+
+    python -m chess_data_api.query_plans
+
+The SQL comes from queries.py, which app.py runs as well. Put any new
+per-request query there and add its shape to HOT_QUERIES.
+"""
+import argparse
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from . import queries
+from .database import migrate
+
+
+HOT_QUERIES: Dict[str, str] = {
+    "player": queries.PLAYER,
+    "players by id": queries.rows_by_ids("players", 3),
+    "teams by id": queries.rows_by_ids("teams", 3),
+    "officials by id": queries.rows_by_ids("officials", 3),
+    "team members": queries.TEAM_MEMBERS,
+    "team": queries.TEAM,
+    "tournament": queries.TOURNAMENT,
+    "game": queries.GAME,
+    "game tournament": queries.GAME_TOURNAMENT,
+    "tournament games": queries.TOURNAMENT_GAMES,
+    "round games": queries.ROUND_GAMES,
+    "round results": queries.ROUND_RESULTS,
+    "pairing history": queries.PAIRING_HISTORY,
+    "enrollment": queries.ENROLLMENT,
+    "enrolled players": queries.ENROLLED_PLAYERS,
+    "lineups": queries.LINEUPS,
+    "player standings": queries.PLAYER_STANDINGS,
+    "tournament standings": queries.TOURNAMENT_STANDINGS,
+    "standings of players": queries.standings_of(3),
+    "enrolled standings": queries.ENROLLED_STANDINGS,
+    **{
+        f"standings rebuild {step}": sql
+        for step, sql in enumerate(queries.rebuild_standings("tournament_id = :tournament_id"), start=1)
+    },
+    "player page": queries.page("players", [], after=True),
+    "team player page": queries.page("players", ["team"], after=True),
+    "game page": queries.page("games", ["tournament_id"], after=True),
+    "unresolved game page": queries.page("games", ["tournament_id"], ["result IS NULL"], after=True),
+    "player game page": queries.player_games_page([], after=True),
+    "player tournament game page": queries.player_games_page(["tournament_id"], after=True),
+    "tournament page": queries.page("tournaments", ["official"], after=True),
+    "enrollment page": queries.page("enrollment", ["tournament_id"], after=True),
+    "tournament versions": queries.TOURNAMENT_VERSIONS,
+    "standings versions": queries.STANDINGS_VERSIONS,
+    "game versions": queries.GAME_VERSIONS,
+    "team versions": queries.TEAM_VERSIONS,
+    "player versions": queries.PLAYER_VERSIONS,
+    "official versions": queries.OFFICIAL_VERSIONS,
+    "game delete": queries.DELETE_GAME,
+    "player delete": queries.DELETE_PLAYER,
+}
+
+
+def scans(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Returns the plan steps that read a whole table (or a whole index).
+    Scans of subqueries, CTEs and constant rows are fine."""
+    named = re.findall(r":(\w+)", sql)
+    numbered = [int(n) for n in re.findall(r"\?(\d+)", sql)]
+    parameters = dict.fromkeys(named) if named else [None] * (max(numbered) if numbered else sql.count("?"))
+    plan = [detail for _, _, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+    derived = {detail.split()[1] for detail in plan if detail.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+    return [
+        detail for detail in plan
+        if detail.startswith("SCAN ") and detail.split()[1] not in derived
+        and not detail.startswith(("SCAN (", "SCAN CONSTANT ROW")) and not re.match(r"SCAN \d+ CONSTANT ROWS", detail)
+    ]
+
+
+def check(path: Path) -> Dict[str, List[str]]:
+    conn = sqlite3.connect(path)
+    try:
+        return {name: found for name, sql in HOT_QUERIES.items() if (found := scans(conn, sql))}
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query's plan scans a table.")
+    parser.add_argument("--db", type=Path, help="check this database instead of a fresh one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.db
+        if path is None:
+            path = Path(scratch) / "plans.db"
+            migrate(path, Path(__file__).parent / "migrations")
+
+        failures = check(path)
+
+    for name, steps in failures.items():
+        print(f"{name}: {'; '.join(steps)}")
+    if failures:
+        sys.exit(1)
+    print(f"{len(HOT_QUERIES)} queries, no table scans")
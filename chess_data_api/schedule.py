@@ -0,0 +1,98 @@
+"""Schedule generators for events whose pairings are fixed in advance.
+
+A schedule is a list of rounds, each a list of ``(board, white, black)``
+tuples, plus the byes that fall out of an odd field. Generators work on
+plain ids and never touch the database.
+"""
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class Schedule:
+    def __init__(self):
+        self.rounds: List[List[Tuple[int, int, int]]] = []
+        # (round index, id) for entries that sit a round out
+        self.byes: List[Tuple[int, int]] = []
+
+    @property
+    def boards(self) -> int:
+        return max((board + 1 for games in self.rounds for board, _, _ in games), default=0)
+
+    @property
+    def games(self) -> int:
+        return sum(len(games) for games in self.rounds)
+
+
+def berger_rounds(entries: Sequence[T]) -> List[List[Tuple[Optional[T], Optional[T]]]]:
+    """Pairings from the FIDE Berger tables, as (white, black) per round.
+
+    An odd field gets a dummy entry (None); whoever meets it has the bye."""
+    entries = list(entries)
+    if len(entries) % 2:
+        entries.append(None)
+
+    n = len(entries)
+    rounds = []
+
+    for round in range(n - 1):
+        # entry n stays put while the others move n / 2 places each round
+        order = [entries[(round * (n // 2) + k) % (n - 1)] for k in range(n - 1)]
+        pairs = [(order[0], entries[-1]) if round % 2 == 0 else (entries[-1], order[0])]
+        pairs += [(order[k], order[n - 1 - k]) for k in range(1, n // 2)]
+        rounds.append(pairs)
+
+    return rounds
+
+
+def cycle_rounds(entries: Sequence[T], cycles: int) -> List[List[Tuple[Optional[T], Optional[T]]]]:
+    """Repeats the Berger rounds, swapping colours in every second cycle."""
+    single = berger_rounds(entries)
+    rounds = []
+
+    for cycle in range(cycles):
+        for pairs in single:
+            rounds.append([(b, a) for a, b in pairs] if cycle % 2 else pairs)
+
+    return rounds
+
+
+def round_robin(players: Sequence[int], cycles: int = 1) -> Schedule:
+    """Every player meets every other player ``cycles`` times."""
+    schedule = Schedule()
+
+    for index, pairs in enumerate(cycle_rounds(players, cycles)):
+        games = []
+        for white, black in pairs:
+            if white is None or black is None:
+                schedule.byes.append((index, white if black is None else black))
+            else:
+                games.append((len(games), white, black))
+        schedule.rounds.append(games)
+
+    return schedule
+
+
+def team_matches(lineups: Dict[int, List[int]], boards: int, cycles: int = 1) -> Schedule:
+    """A team round robin. In each match the n-th player of one lineup meets
+    the n-th player of the other; the first-named team has white on the odd
+    boards (1, 3, ...) and black on the even ones. Boards a team cannot fill
+    are left out. Matches in a round use consecutive blocks of boards."""
+    schedule = Schedule()
+
+    for index, pairs in enumerate(cycle_rounds(list(lineups), cycles)):
+        games = []
+        for match, (home, away) in enumerate(p for p in pairs if None not in p):
+            for seat in range(boards):
+                if seat >= len(lineups[home]) or seat >= len(lineups[away]):
+                    continue
+                board = match * boards + seat
+                if seat % 2 == 0:
+                    games.append((board, lineups[home][seat], lineups[away][seat]))
+                else:
+                    games.append((board, lineups[away][seat], lineups[home][seat]))
+        schedule.byes += [(index, home if away is None else away) for home, away in pairs if None in (home, away)]
+        schedule.rounds.append(games)
+
+    return schedule
@@ -0,0 +1,95 @@
+"""Serves the API from several processes sharing one port.
+
+Each worker is a separate aiohttp server bound with SO_REUSEPORT, so the
+kernel spreads connections across them, with its own reader and writer
+connections to the WAL database. Writes from different workers are
+serialized by SQLite itself: every write transaction starts with BEGIN
+IMMEDIATE and waits up to ``busy_timeout_ms`` for the others. Workers get
+consecutive id generator nodes from ``node_id`` and tell each other about
+cache invalidations and live events through channel.py.
+
+The supervisor applies migrations once, restarts workers that die and
+stops them all on SIGINT or SIGTERM::
+
+    python -m chess_data_api --workers 4 --port 8080
+"""
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+from .app import create_app
+from .channel import Channel
+from .config import merge
+from .database import migrate
+from .ids import MAX_NODE
+
+
+# A worker that dies sooner than this after starting is restarted after a
+# pause instead of straight away, so a broken build does not spin.
+MIN_UPTIME = 1.0
+
+
+def run_worker(config: Dict[str, Any], index: int, workers: int, directory: str, host: str, port: int) -> None:
+    config = merge(config, {"node_id": config["node_id"] + index, "database": {"migrate": False}})
+    app = create_app(config, channel=Channel(Path(directory), index, workers))
+    web.run_app(app, host=host, port=port, reuse_port=True, print=None)
+
+
+def serve(config: Dict[str, Any], workers: int, host: str, port: int) -> None:
+    if config["node_id"] + workers - 1 > MAX_NODE:
+        raise ValueError(f"node_id + workers must not go past {MAX_NODE + 1}!")
+
+    if config["database"]["migrate"]:
+        migrate(Path(config["database"]["path"]))
+    directory = tempfile.mkdtemp(prefix="chess-data-api-")
+    # forked before any event loop exists, so workers start clean
+    context = multiprocessing.get_context("fork")
+    processes: List[multiprocessing.Process | None] = [None] * workers
+    started = [0.0] * workers
+    stopping = False
+
+    def start(index: int) -> None:
+        process = context.Process(
+            target=run_worker, args=(config, index, workers, directory, host, port), name=f"worker-{index}"
+        )
+        process.start()
+        processes[index] = process
+        started[index] = time.monotonic()
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for index in range(workers):
+            start(index)
+        print(f"Serving on http://{host}:{port} with {workers} workers (supervisor pid {os.getpid()})")
+
+        while not stopping:
+            time.sleep(0.2)
+            for index, process in enumerate(processes):
+                if process.is_alive() or stopping:
+                    continue
+                print(f"worker {index} (pid {process.pid}) exited with {process.exitcode}, restarting")
+                if time.monotonic() - started[index] < MIN_UPTIME:
+                    time.sleep(MIN_UPTIME)
+                start(index)
+    finally:
+        for process in processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in processes:
+            if process is not None:
+                process.join()
+        shutil.rmtree(directory, ignore_errors=True)
+
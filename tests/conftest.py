@@ -0,0 +1,47 @@
+import asyncio
+import base64
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from chess_data_api import create_app
+
+
+HEADERS = {"Authorization": "Basic " + base64.b64encode(b"test:test").decode()}
+
+
+class Api:
+    """A test client that sends the credentials and decodes JSON bodies."""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+        self.headers = HEADERS
+
+    async def call(self, method: str, path: str, body: Any = None, headers: Dict[str, str] | None = None) \
+            -> Tuple[int, Any, Any]:
+        async with self.client.request(method, path, json=body, headers={**HEADERS, **(headers or {})}) as response:
+            data = await response.json() if response.content_type == "application/json" else await response.read()
+            return response.status, data, response.headers
+
+    async def ok(self, method: str, path: str, body: Any = None) -> Any:
+        status, data, _ = await self.call(method, path, body)
+        assert status == 200, data
+        return data
+
+
+@pytest.fixture
+def run_api(tmp_path) -> Callable[[Callable[[Api], Awaitable[Any]]], Any]:
+    """Runs ``scenario(api)`` against an app on a fresh database."""
+    def run(scenario: Callable[[Api], Awaitable[Any]], **config: Any) -> Any:
+        async def main() -> Any:
+            app = create_app({
+                "username": "test", "password": "test",
+                "database": {"path": str(tmp_path / "test.sqlite3")}, **config
+            })
+            async with TestClient(TestServer(app)) as client:
+                return await scenario(Api(client))
+
+        return asyncio.run(main())
+
+    return run
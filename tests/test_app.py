@@ -0,0 +1,34 @@
+"""Several configured apps can live in one process."""
+import asyncio
+import logging
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from chess_data_api import create_app
+from chess_data_api.ids import decode
+
+from conftest import HEADERS
+
+
+def test_apps_keep_their_own_settings(tmp_path, caplog):
+    async def main():
+        apps = [
+            create_app({
+                "username": "test", "password": "test", "node_id": node,
+                "database": {"path": str(tmp_path / f"{node}.sqlite3")},
+                "instrumentation": {"enabled": True, "slow_query_ms": slow_query_ms},
+            })
+            for node, slow_query_ms in ((1, 0), (2, 60000))
+        ]
+        nodes = []
+        for app in apps:
+            async with TestClient(TestServer(app)) as client:
+                caplog.clear()
+                async with client.post("/teams", json={"name": "A", "sponsor": "S"}, headers=HEADERS) as response:
+                    nodes.append(decode((await response.json())["id"])["node"])
+                slow = [record for record in caplog.records if record.getMessage().startswith("slow query")]
+                nodes.append(bool(slow))
+        return nodes
+
+    with caplog.at_level(logging.WARNING, logger="chess_data_api.instrument"):
+        assert asyncio.run(main()) == [1, True, 2, False]
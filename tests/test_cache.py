@@ -0,0 +1,96 @@
+"""Response cache bookkeeping: tags, generations, ETags, eviction and
+single-flight builds."""
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from chess_data_api.cache import ResponseCache, cached, document_tags
+
+
+def test_document_tags_cover_embedded_entities():
+    document = {"type": "game", "id": 1, "white": {"type": "player", "id": "2"}, "moves": [{"type": "x", "id": None}]}
+    assert set(document_tags(document)) == {("game", 1), ("player", 2)}
+
+
+def test_invalidation_drops_tagged_entries_and_stale_puts():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.put("a", b"A", [("player", 1)], generation)
+    cache.put("b", b"B", [("player", 2)], generation)
+    cache.invalidate([("player", 1)])
+    assert cache.get("a") is None
+    assert cache.get("b") == b"B"
+    # built from a read that started before the invalidation
+    cache.put("a", b"old", [("player", 1)], generation)
+    assert cache.get("a") is None
+
+
+def test_entries_only_match_their_etag():
+    cache = ResponseCache()
+    cache.put("a", b"A", [], cache.generation, etag='"1-2"')
+    assert cache.get("a", '"1-3"') is None
+    assert cache.get("a", '"1-2"') == b"A"
+
+
+def test_least_recently_used_goes_first():
+    cache = ResponseCache(max_entries=10, max_bytes=4)
+    for key in "abc":
+        cache.put(key, b"xx", [("team", 1)], cache.generation)
+    assert list(cache.entries) == ["b", "c"]
+    assert cache.get("b") == b"xx"
+    cache.put("d", b"xx", [], cache.generation)
+    assert list(cache.entries) == ["b", "d"]
+    assert cache.size == 4 and cache.evictions == 2
+    cache.invalidate([("team", 1)])
+    assert list(cache.entries) == ["d"] and cache.tagged == {}
+
+
+async def single_flight(fail: bool):
+    """Five concurrent misses on one key while its build is held open, then
+    one more request; returns the responses, the number of builds, the
+    cache and the last response."""
+    cache = ResponseCache()
+    release = asyncio.Event()
+    builds = 0
+
+    @cached("thing")
+    async def handler(request):
+        nonlocal builds
+        builds += 1
+        await release.wait()
+        if fail:
+            raise RuntimeError("build failed")
+        return web.json_response({"type": "thing", "id": 1, "builds": builds})
+
+    app = web.Application()
+    app["CACHE"] = cache
+    app.router.add_get("/things/{id}", handler)
+    async with TestClient(TestServer(app)) as client:
+        async def get():
+            async with client.get("/things/1") as response:
+                return response.status, await response.read()
+
+        requests = [asyncio.ensure_future(get()) for _ in range(5)]
+        while cache.coalesced < 4:
+            await asyncio.sleep(0.001)
+        release.set()
+        responses = await asyncio.gather(*requests)
+        after = await get()
+    return responses, builds, cache, after
+
+
+def test_concurrent_misses_build_once():
+    responses, builds, cache, after = asyncio.run(single_flight(fail=False))
+    assert builds == 1
+    assert responses == [(200, b'{"type": "thing", "id": 1, "builds": 1}')] * 5
+    assert after == responses[0]
+    assert list(cache.entries) == ["/things/1"] and cache.inflight == {}
+
+
+def test_a_failed_build_reaches_every_waiter_and_is_not_cached():
+    responses, builds, cache, after = asyncio.run(single_flight(fail=True))
+    assert [status for status, _ in responses + [after]] == [500] * 6
+    # one build for the five concurrent requests, a new one for the next
+    assert builds == 2
+    assert cache.entries == {} and cache.inflight == {}
@@ -0,0 +1,31 @@
+"""Command-line maintenance tasks."""
+import json
+import sqlite3
+
+from chess_data_api.cli import main
+from test_etags import setup
+
+
+def test_rebuild_standings_recomputes_every_tournament(run_api, tmp_path):
+    async def scenario(api):
+        ids = await setup(api)
+        await api.ok("POST", f"/tournaments/{ids['tournament']['id']}/enroll/mass", {"list": [
+            {"player": player["id"], "team": ids["team"]["id"]} for player in ids["players"][:2]
+        ]})
+        await api.ok("POST", f"/games/{ids['game']['id']}/resolve",
+                     {"official": ids["officials"][0]["id"], "result": ids["players"][0]["id"]})
+        return ids
+
+    ids = run_api(scenario)
+    path = tmp_path / "test.sqlite3"
+    standings = "SELECT player_id, wins, losses, score FROM tournament_standings ORDER BY score DESC, player_id"
+    with sqlite3.connect(path) as db:
+        expected = db.execute(standings).fetchall()
+        db.execute("UPDATE tournament_standings SET wins = 0, losses = 3, score = 0")
+
+    (tmp_path / "config.json").write_text(json.dumps({"username": "test", "password": "test"}))
+    main(["--config", str(tmp_path / "config.json"), "--db", str(path), "--rebuild-standings"])
+
+    with sqlite3.connect(path) as db:
+        assert db.execute(standings).fetchall() == expected
+    assert expected[0][:3] == (ids["players"][0]["id"], 1, 0)
@@ -0,0 +1,23 @@
+"""Compressed bodies must always match the identity body."""
+import gzip
+
+from test_etags import setup
+
+
+def test_compressed_body_follows_the_document(run_api):
+    async def scenario(api) -> None:
+        ids = await setup(api)
+        path = f"/tournaments/{ids['tournament']['id']}"
+        game = f"/games/{ids['game']['id']}"
+        x, y = (official["id"] for official in ids["officials"])
+        await api.ok("PATCH", f"/officials/{y}", {"name": "Y2"})
+        for official in (x, y, x):
+            await api.ok("PATCH", game, {"official": official})
+            identity = await api.client.get(path, headers={**api.headers, "Accept-Encoding": "identity"})
+            plain = await identity.read()
+            encoded = await api.client.get(path, headers={**api.headers, "Accept-Encoding": "gzip"},
+                                           auto_decompress=False)
+            assert encoded.headers.get("Content-Encoding") == "gzip"
+            assert gzip.decompress(await encoded.read()) == plain
+
+    run_api(scenario, compression={"min_bytes": 0})
@@ -0,0 +1,68 @@
+"""Group commit: concurrent write transactions share one COMMIT."""
+import asyncio
+import sqlite3
+
+import pytest
+
+from chess_data_api.database import Database, migrate
+
+
+def test_group_commit_shares_commits_and_isolates_failures(tmp_path):
+    path = tmp_path / "test.sqlite3"
+    migrate(path)
+
+    async def write(db, name, fail=False):
+        async with db.transaction() as conn:
+            await conn.execute("INSERT INTO teams (name) VALUES (?)", [name])
+            if fail:
+                raise ValueError(name)
+
+    async def main():
+        db = Database(path, readers=1, group_commit_ms=50, group_commit_max=64)
+        await db.open()
+        commits = 0
+        commit = db.commit
+
+        async def counted():
+            nonlocal commits
+            commits += 1
+            await commit()
+
+        db.commit = counted
+        try:
+            results = await asyncio.gather(
+                *(write(db, f"T{n}", fail=n == 3) for n in range(8)), return_exceptions=True
+            )
+        finally:
+            await db.close()
+        return commits, results, db
+
+    commits, results, db = asyncio.run(main())
+    assert commits == 1
+    assert [type(result) for result in results] == [type(None)] * 3 + [ValueError] + [type(None)] * 4
+    assert (db.committed, db.rolled_back) == (7, 1)
+    with sqlite3.connect(path) as conn:
+        names = [name for name, in conn.execute("SELECT name FROM teams ORDER BY name")]
+    assert names == ["T0", "T1", "T2", "T4", "T5", "T6", "T7"]
+
+
+def test_without_grouping_each_transaction_commits(tmp_path):
+    path = tmp_path / "test.sqlite3"
+    migrate(path)
+
+    async def main():
+        db = Database(path, readers=1)
+        await db.open()
+        try:
+            with pytest.raises(ValueError):
+                async with db.transaction() as conn:
+                    await conn.execute("INSERT INTO teams (name) VALUES ('lost')")
+                    raise ValueError
+            async with db.transaction() as conn:
+                await conn.execute("INSERT INTO teams (name) VALUES ('kept')")
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT name FROM teams").fetchall() == [("kept",)]
@@ -0,0 +1,41 @@
+"""Mass enrollment: all cards in one transaction, or none."""
+import sqlite3
+
+from test_etags import setup
+
+
+def enrolled(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT player_id FROM enrollment ORDER BY player_id").fetchall()
+
+
+def test_enroll_mass_is_one_transaction(run_api, tmp_path):
+    async def scenario(api):
+        ids = await setup(api)
+        database = api.client.app["DB"]
+        path = f"/tournaments/{ids['tournament']['id']}/enroll/mass"
+        players = [player["id"] for player in ids["players"]]
+
+        def card(player):
+            return {"player": player, "team": ids["team"]["id"]}
+
+        for cards in (
+            [card(players[0]), card(players[1]), card(players[0])],
+            [card(players[0]), card(12345)],
+            [card(players[0]), {"player": players[1], "team": 12345}],
+        ):
+            status, _, _ = await api.call("POST", path, {"list": cards})
+            assert status == 400
+            assert enrolled(tmp_path / "test.sqlite3") == []
+
+        committed = database.committed
+        cards = await api.ok("POST", path, {"list": [card(player) for player in players[:3]]})
+        assert database.committed == committed + 1
+        assert [card["player"]["id"] for card in cards] == players[:3]
+
+        # already enrolled
+        status, body, _ = await api.call("POST", path, {"list": [card(players[3]), card(players[2])]})
+        assert status == 400 and str(players[2]) in body["reason"]
+        assert enrolled(tmp_path / "test.sqlite3") == [(player,) for player in players[:3]]
+
+    run_api(scenario)
@@ -0,0 +1,97 @@
+"""ETags must change on every write to what a document embeds."""
+import sqlite3
+from typing import Any, Dict, List
+
+
+async def setup(api) -> Dict[str, Any]:
+    team = await api.ok("POST", "/teams", {"name": "A", "sponsor": "S"})
+    players = [
+        await api.ok("POST", "/players", {"name": f"P{n} Last", "grade": 10, "team": team["id"]})
+        for n in range(4)
+    ]
+    officials = [await api.ok("POST", "/officials", {"name": name, "email": "o@x"}) for name in ("X", "Y")]
+    tournament = await api.ok("POST", "/tournaments", {
+        "name": "T", "date": 1, "official": officials[0]["id"], "location": "L", "boards": 2, "rounds": 1
+    })
+    game = await api.ok("POST", "/games", {
+        "white": players[0]["id"], "black": players[1]["id"], "board": 0, "round": 1,
+        "tournament": tournament["id"]
+    })
+    return {"team": team, "players": players, "officials": officials, "tournament": tournament, "game": game}
+
+
+async def etag(api, path: str) -> str:
+    status, _, headers = await api.call("GET", path)
+    assert status == 200
+    return headers["ETag"]
+
+
+def test_repointing_a_game_never_repeats_an_etag(run_api):
+    async def scenario(api) -> List[str]:
+        ids = await setup(api)
+        path = f"/tournaments/{ids['tournament']['id']}"
+        game = f"/games/{ids['game']['id']}"
+        x, y = (official["id"] for official in ids["officials"])
+        # Y's version one ahead of X's, so X -> Y -> X brings a plain sum back
+        await api.ok("PATCH", f"/officials/{y}", {"name": "Y2"})
+        seen = [await etag(api, path)]
+        for official in (y, x, y, x):
+            await api.ok("PATCH", game, {"official": official})
+            seen.append(await etag(api, path))
+        return seen
+
+    seen = run_api(scenario)
+    assert len(set(seen)) == len(seen), seen
+
+
+def test_every_write_changes_the_etag(run_api):
+    async def scenario(api) -> None:
+        ids = await setup(api)
+        paths = [f"/tournaments/{ids['tournament']['id']}", f"/games/{ids['game']['id']}"]
+        writes = [
+            ("PATCH", f"/players/{ids['players'][0]['id']}", {"name": "Renamed"}),
+            ("PATCH", f"/games/{ids['game']['id']}", {"white": ids["players"][2]["id"]}),
+            ("PATCH", f"/games/{ids['game']['id']}", {"white": ids["players"][0]["id"]}),
+            ("POST", f"/games/{ids['game']['id']}/resolve", {"official": ids["officials"][1]["id"], "result": "draw"}),
+            ("PATCH", f"/officials/{ids['officials'][1]['id']}", {"name": "Z"}),
+        ]
+        seen = {path: [await etag(api, path)] for path in paths}
+        for method, path, body in writes:
+            await api.ok(method, path, body)
+            for document in paths:
+                seen[document].append(await etag(api, document))
+        for document, tags in seen.items():
+            assert len(set(tags)) == len(tags), (document, tags)
+
+    run_api(scenario)
+
+
+def test_matching_etag_is_not_modified_and_body_is_current(run_api):
+    async def scenario(api) -> None:
+        ids = await setup(api)
+        path = f"/games/{ids['game']['id']}"
+        tag = await etag(api, path)
+        status, _, _ = await api.call("GET", path, headers={"If-None-Match": tag})
+        assert status == 304
+        await api.ok("PATCH", path, {"official": ids["officials"][1]["id"]})
+        for encoding in ("identity", "gzip"):
+            status, body, _ = await api.call("GET", path, headers={"If-None-Match": tag, "Accept-Encoding": encoding})
+            assert status == 200
+            assert body["official"]["id"] == ids["officials"][1]["id"]
+
+    run_api(scenario)
+
+
+def test_cached_body_is_not_reused_under_newer_versions(run_api):
+    async def scenario(api) -> None:
+        ids = await setup(api)
+        path = f"/games/{ids['game']['id']}"
+        status, before, headers = await api.call("GET", path)
+        # a write this worker has not been told about yet, as from another worker
+        with sqlite3.connect(api.client.server.app["CONFIG"]["database"]["path"]) as conn:
+            conn.execute("UPDATE players SET name = 'Elsewhere' WHERE id = ?", [ids["players"][0]["id"]])
+        status, after, new_headers = await api.call("GET", path)
+        assert new_headers["ETag"] != headers["ETag"]
+        assert after["white"]["name"] == "Elsewhere"
+
+    run_api(scenario)
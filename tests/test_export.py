@@ -0,0 +1,59 @@
+"""Streaming NDJSON and CSV exports."""
+import csv
+import io
+import json
+
+from test_etags import setup
+
+
+def test_games_export_formats(run_api):
+    async def scenario(api):
+        ids = await setup(api)
+        tournament = ids["tournament"]["id"]
+        await api.ok("POST", "/games", {
+            "white": ids["players"][2]["id"], "black": ids["players"][3]["id"], "board": 1, "round": 1,
+            "tournament": tournament
+        })
+
+        status, body, headers = await api.call("GET", f"/export/games?tournament={tournament}")
+        assert status == 200
+        assert headers["Content-Type"] == "application/x-ndjson"
+        assert headers["Content-Disposition"] == 'attachment; filename="games.ndjson"'
+        games = [json.loads(line) for line in body.decode().splitlines()]
+        assert [game["white_name"] for game in games] == ["P0 Last", "P2 Last"]
+        assert body.endswith(b"\n")
+
+        status, body, headers = await api.call("GET", f"/export/games?tournament={tournament}&format=csv")
+        assert status == 200
+        assert headers["Content-Type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        assert rows[0] == ["id", "tournament_id", "tournament", "round", "board",
+                           "white", "white_name", "black", "black_name", "official", "result"]
+        assert len(rows) == 3
+        assert [row[0] for row in rows[1:]] == [str(game["id"]) for game in games]
+
+        status, body, _ = await api.call("GET", "/export/players?format=csv")
+        assert len(list(csv.reader(io.StringIO(body.decode())))) == 1 + len(ids["players"])
+
+        status, _, _ = await api.call("GET", "/export/games?format=xml")
+        assert status == 400
+
+    run_api(scenario)
+
+
+def test_empty_exports_are_well_formed(run_api):
+    async def scenario(api):
+        ids = await setup(api)
+        official = ids["officials"][0]["id"]
+        empty = await api.ok("POST", "/tournaments", {
+            "name": "Empty", "date": 1, "official": official, "location": "L", "boards": 1, "rounds": 1
+        })
+        for path in (f"/export/games?tournament={empty['id']}", f"/export/standings?tournament={empty['id']}"):
+            status, body, _ = await api.call("GET", path)
+            assert (status, body) == (200, b"")
+            status, body, _ = await api.call("GET", path + "&format=csv")
+            assert status == 200
+            rows = list(csv.reader(io.StringIO(body.decode())))
+            assert len(rows) == 1 and "tournament" in rows[0]
+
+    run_api(scenario)
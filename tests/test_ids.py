@@ -0,0 +1,49 @@
+"""Snowflake ids: fields that do not overlap, and ids JavaScript reads exactly."""
+from chess_data_api import ids
+from chess_data_api.ids import IdGenerator, decode
+
+# Number.MAX_SAFE_INTEGER
+MAX_SAFE_INTEGER = (1 << 53) - 1
+
+
+def test_last_id_is_a_safe_integer():
+    generator = IdGenerator(ids.MAX_NODE)
+    generator.last_ms = (1 << ids.TIME_BITS) - 1
+    generator.sequence = ids.MAX_SEQUENCE
+    id = generator.next(ids.MAX_TYPE)
+    assert id == MAX_SAFE_INTEGER
+    assert decode(id)["time"].startswith("2091-")
+
+
+def test_fields_round_trip():
+    generator = IdGenerator(7)
+    block = generator.allocate(3, 3 * (ids.MAX_SEQUENCE + 1))
+    assert block == sorted(set(block))
+    assert [decode(id)["sequence"] for id in block[:ids.MAX_SEQUENCE + 2]] == [*range(ids.MAX_SEQUENCE + 1), 0]
+    assert {(decode(id)["node"], decode(id)["type"]) for id in block} == {(7, 3)}
+
+
+def test_advance_past_never_goes_back():
+    generator = IdGenerator(1)
+    ahead = IdGenerator(1)
+    ahead.last_ms = generator.next(1) >> ids.TIME_SHIFT
+    last = ahead.allocate(1, 100 * (ids.MAX_SEQUENCE + 1))[-1]
+    generator.advance_past(last)
+    assert generator.next(1) > last
+    generator.advance_past(0)
+    assert generator.next(1) > last
+
+
+def test_restarted_node_starts_past_the_ids_it_handed_out(run_api):
+    async def first(api):
+        # a bulk allocation runs the generator seconds ahead of the clock
+        api.client.app["IDS"].allocate(1, 100000)
+        return (await api.ok("POST", "/teams", {"name": "A", "sponsor": "S"}))["id"]
+
+    async def restarted(api):
+        return (await api.ok("POST", "/teams", {"name": "B", "sponsor": "S"}))["id"]
+
+    before = run_api(first, node_id=1)
+    after = run_api(restarted, node_id=1)
+    assert after > before
+    assert decode(after)["node"] == 1
@@ -0,0 +1,43 @@
+"""Bulk imports keep going past rows the database rejects."""
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from chess_data_api import imports
+from chess_data_api.imports import run_import
+
+
+async def lines(body: bytes):
+    for line in body.splitlines(keepends=True):
+        yield line
+
+
+def upload(body: bytes) -> SimpleNamespace:
+    return SimpleNamespace(query={}, content_type="application/x-ndjson", content=lines(body))
+
+
+def test_rejected_rows_are_reported_and_the_rest_kept(monkeypatch):
+    monkeypatch.setattr(imports, "BATCH_SIZE", 3)
+    written = []
+
+    async def write(rows):
+        if any(row == ["bad"] for row in rows):
+            raise sqlite3.IntegrityError("rejected")
+        written.extend(rows)
+
+    body = b"\n".join(b'{"name": "%s"}' % name for name in [b"a", b"bad", b"c", b"d", b"e", b"bad"])
+    body += b"\n{\n"
+    report = asyncio.run(run_import(upload(body), "teams", lambda record: [record["name"]], write))
+
+    assert written == [["a"], ["c"], ["d"], ["e"]]
+    assert report.to_json() == {
+        "status": "partial",
+        "entity": "teams",
+        "imported": 4,
+        "failed": 3,
+        "errors": [
+            {"line": 2, "reason": "not written: rejected"},
+            {"line": 6, "reason": "not written: rejected"},
+            {"line": 7, "reason": "unreadable: Expecting property name enclosed in double quotes: line 1 column 2 (char 1)"},
+        ],
+    }
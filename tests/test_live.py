@@ -0,0 +1,51 @@
+"""Server-sent events for a tournament."""
+import asyncio
+import json
+from typing import Dict
+
+from conftest import HEADERS
+from test_etags import setup
+
+
+async def next_event(response) -> Dict[str, bytes]:
+    """Reads one event, skipping keep-alive comments."""
+    fields: Dict[str, bytes] = {}
+    while True:
+        line = (await asyncio.wait_for(response.content.readline(), 5)).rstrip(b"\n")
+        if not line:
+            if fields:
+                return fields
+            continue
+        if line.startswith(b":"):
+            continue
+        name, _, value = line.partition(b": ")
+        fields[name.decode()] = value
+
+
+def test_results_reach_subscribers(run_api):
+    async def scenario(api):
+        ids = await setup(api)
+        tournament, game = ids["tournament"]["id"], ids["game"]["id"]
+        serializer = api.client.app["SERIALIZER"]
+        async with api.client.get(f"/tournaments/{tournament}/live", headers=HEADERS) as response:
+            assert response.headers["Content-Type"] == "text/event-stream"
+            hello = await next_event(response)
+            assert hello["event"] == b"hello"
+            assert json.loads(hello["data"])["tournament"]["id"] == tournament
+
+            await api.ok("POST", f"/games/{game}/resolve", {"official": ids["officials"][0]["id"], "result": "draw"})
+            event = await next_event(response)
+            assert event["event"] == b"result"
+            assert int(event["id"]) == 1
+            data = json.loads(event["data"])
+            assert (data["game"], data["result"]) == (game, "draw")
+            assert sorted(row["draws"] for row in data["standings"]) == [1, 1]
+            # encoded like every other response
+            assert event["data"] == serializer.encode(data)
+
+            await api.ok("PATCH", f"/games/{game}", {"board": 1})
+            assert (await next_event(response))["id"] == b"2"
+
+        assert api.client.app["LIVE"].stats()["delivered"] == 2
+
+    run_api(scenario)
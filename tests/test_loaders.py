@@ -0,0 +1,33 @@
+"""Loaders batch the ids asked for in one tick and remember the results."""
+import asyncio
+
+import pytest
+
+from chess_data_api.loaders import Loader
+
+
+class Missing(Exception):
+    pass
+
+
+def test_one_batch_per_tick_and_memoized():
+    batches = []
+
+    async def batch_fn(db, ids):
+        batches.append(sorted(ids))
+        return {id: f"row {id}" for id in ids if id != 3}
+
+    async def main():
+        loader = Loader(None, batch_fn, Missing)
+        assert await loader.load_many([1, "2", 1]) == ["row 1", "row 2", "row 1"]
+        assert await asyncio.gather(loader.load(2), loader.load(4)) == ["row 2", "row 4"]
+        with pytest.raises(Missing):
+            await loader.load(3)
+        with pytest.raises(Missing):
+            await loader.load("three")
+        # a missing id is not remembered, so a later insert is seen
+        with pytest.raises(Missing):
+            await loader.load(3)
+
+    asyncio.run(main())
+    assert batches == [[1, 2], [4], [3], [3]]
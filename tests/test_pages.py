@@ -0,0 +1,90 @@
+"""Keyset-paginated list endpoints."""
+from typing import Any, List
+
+from chess_data_api import app
+
+
+async def walk(api, path: str, limit: int) -> List[Any]:
+    """Follows ``next`` from the first page to the last."""
+    items, after = [], None
+    while True:
+        cursor = f"&after={after}" if after is not None else ""
+        body = await api.ok("GET", f"{path}{'&' if '?' in path else '?'}limit={limit}{cursor}")
+        assert body["type"] == "page" and len(body["items"]) <= limit
+        items += body["items"]
+        after = body["next"]
+        if after is None:
+            return items
+        assert after == body["items"][-1]["id"]
+
+
+async def field(api, players: int):
+    team = await api.ok("POST", "/teams", {"name": "A", "sponsor": "S"})
+    # the same name and grade for everyone, so only the id tells them apart
+    ids = [
+        (await api.ok("POST", "/players", {"name": "Same Name", "grade": 10, "team": team["id"]}))["id"]
+        for _ in range(players)
+    ]
+    return team["id"], ids
+
+
+def test_cursors_round_trip_in_id_order(run_api):
+    async def scenario(api):
+        team, ids = await field(api, 7)
+        other, others = await field(api, 2)
+        for limit in (1, 3, 7, 8):
+            assert [player["id"] for player in await walk(api, "/players", limit)] == sorted(ids + others)
+            assert [player["id"] for player in await walk(api, f"/players?team={team}", limit)] == ids
+
+        official = await api.ok("POST", "/officials", {"name": "O", "email": "o@x"})
+        tournament = await api.ok("POST", "/tournaments", {
+            "name": "T", "date": 1, "official": official["id"], "location": "L", "boards": 3, "rounds": 3
+        })
+        # the first player alternates colours, so its games come from both walks
+        games = []
+        for round, opponent in enumerate(ids[1:], start=1):
+            white, black = (ids[0], opponent) if round % 2 else (opponent, ids[0])
+            games.append((await api.ok("POST", "/games", {
+                "white": white, "black": black, "board": 0, "round": round, "tournament": tournament["id"]
+            }))["id"])
+        for limit in (1, 2, 6):
+            assert [game["id"] for game in await walk(api, f"/players/{ids[0]}/games", limit)] == games
+            assert [game["id"] for game in await walk(api, f"/games?tournament={tournament['id']}", limit)] == games
+        assert [game["id"] for game in await walk(api, f"/players/{ids[1]}/games", 1)] == games[:1]
+
+        await api.ok("POST", f"/tournaments/{tournament['id']}/enroll/mass", {"list": [
+            {"player": player, "team": team} for player in ids
+        ]})
+        enrollments = await walk(api, f"/tournaments/{tournament['id']}/enrollments", 2)
+        assert [enrollment["player"]["id"] for enrollment in enrollments] == ids
+        assert [t["id"] for t in await walk(api, f"/tournaments?official={official['id']}", 1)] == [tournament["id"]]
+
+    run_api(scenario)
+
+
+def test_limits_are_clamped(run_api, monkeypatch):
+    monkeypatch.setattr(app, "MAX_PAGE_SIZE", 4)
+
+    async def scenario(api):
+        _, ids = await field(api, 6)
+        for limit, expected in (("0", 1), ("-5", 1), ("3", 3), ("100", 4)):
+            body = await api.ok("GET", f"/players?limit={limit}")
+            assert [player["id"] for player in body["items"]] == ids[:expected]
+            assert body["next"] == ids[expected - 1]
+        body = await api.ok("GET", "/players")
+        assert len(body["items"]) == 4
+
+    run_api(scenario)
+
+
+def test_malformed_cursors_are_rejected(run_api):
+    async def scenario(api):
+        _, ids = await field(api, 2)
+        for query in ("after=abc", "after=", "limit=ten", f"team=x&after={ids[0]}"):
+            status, body, _ = await api.call("GET", f"/players?{query}")
+            assert status == 400, query
+            assert body["status"] == "failed"
+        status, _, _ = await api.call("GET", f"/players/{ids[0]}/games?after=1.5")
+        assert status == 400
+
+    run_api(scenario)
@@ -0,0 +1,135 @@
+"""Swiss pairing: everyone paired, no avoidable rematches, deterministic."""
+import random
+import sqlite3
+from typing import Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from chess_data_api import app
+from chess_data_api.matching import max_weight_matching
+from chess_data_api.pairing import Entrant, Pairing, adjacent, benchmark, build_history, pair_field, swiss
+from test_etags import setup
+
+
+def rematch_free_pairing_exists(ids: List[int], played: Dict[int, Set[int]], odd: bool) -> bool:
+    def pairs_up(left: List[int]) -> bool:
+        if not left:
+            return True
+        first = left[0]
+        return any(
+            pairs_up([id for id in left[1:] if id != other])
+            for other in left[1:] if other not in played[first]
+        )
+
+    if odd:
+        return any(pairs_up([id for id in ids if id != bye]) for bye in ids)
+    return pairs_up(ids)
+
+
+def play(players: int, rounds: int, seed: int) -> List[Tuple[Pairing, Dict[int, Set[int]]]]:
+    """Plays a random event, returning each round's pairing with the
+    opponents everyone had before it."""
+    rng = random.Random(seed)
+    games: List[Tuple[int, int, int]] = []
+    scores = {id: 0.0 for id in range(players)}
+    byes: Set[int] = set()
+    played = []
+    for round in range(1, rounds + 1):
+        history = build_history(games)
+        entrants = [Entrant(id, score, history.get(id), id in byes) for id, score in scores.items()]
+        entrants.sort(key=lambda e: (-e.score, e.id))
+        pairing = swiss(entrants)
+        played.append((pairing, {id: set(history[id].opponents) if id in history else set() for id in scores}))
+        for white, black in pairing.pairs:
+            games.append((round, white, black))
+            outcome = rng.random()
+            if outcome < .45:
+                scores[white] += 1
+            elif outcome < .9:
+                scores[black] += 1
+            else:
+                scores[white] += .5
+                scores[black] += .5
+        if pairing.bye is not None:
+            scores[pairing.bye] += 1
+            byes.add(pairing.bye)
+    return played
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_small_fields_only_rematch_when_unavoidable(seed):
+    players = random.Random(seed).randint(4, 11)
+    for pairing, played in play(players, players - 1, seed):
+        paired = [id for pair in pairing.pairs for id in pair]
+        bye: List[Optional[int]] = [pairing.bye] if pairing.bye is not None else []
+        assert sorted(paired + bye) == list(range(players))
+        if any(black in played[white] for white, black in pairing.pairs):
+            assert not rematch_free_pairing_exists(list(range(players)), played, players % 2 == 1)
+
+
+def test_bye_goes_to_the_lowest_player_without_one():
+    entrants = [Entrant(id, score) for id, score in enumerate([2, 2, 1, 1, 0])]
+    entrants[4].had_bye = True
+    assert swiss(entrants).bye == 3
+
+
+def test_ties_pair_in_the_order_given():
+    entrants = [Entrant(id, 0) for id in (5, 3, 8, 1)]
+    first = swiss(entrants)
+    assert {frozenset(pair) for pair in first.pairs} == {frozenset((5, 8)), frozenset((3, 1))}
+    assert swiss(entrants).pairs == first.pairs
+
+
+def test_adjacent_pairs_neighbours():
+    pairing = adjacent([Entrant(id, 0) for id in range(5)])
+    assert pairing.pairs == [(0, 1), (2, 3)]
+    assert pairing.bye == 4
+
+
+def test_matching_prefers_cardinality_when_asked():
+    edges = [(0, 1, 5), (1, 2, 11), (2, 3, 5)]
+    assert max_weight_matching(edges) == [-1, 2, 1, -1]
+    assert max_weight_matching(edges, maxcardinality=True) == [1, 0, 3, 2]
+
+
+def test_matching_only_sees_the_bottom_of_a_large_field(monkeypatch):
+    pools = []
+
+    def recorded(ranked):
+        pools.append(len(ranked))
+        return pair_field(ranked)
+
+    monkeypatch.setattr("chess_data_api.pairing.pair_field", recorded)
+    for seed in range(3):
+        benchmark(400, 15, seed=seed)
+    assert pools and max(pools) < 40
+
+
+def test_organize_pairs_again_when_standings_change(run_api, tmp_path, monkeypatch):
+    calls = []
+    pair_round = app.pair_round
+
+    def racing(engine, players, games):
+        if not calls:
+            # a result lands while the first pairing is being computed
+            with sqlite3.connect(tmp_path / "test.sqlite3") as db:
+                db.execute("UPDATE tournament_standings SET score = 1, wins = 1 WHERE player_id = ?",
+                           [players[-1]["id"]])
+        calls.append([player["id"] for player in players])
+        return pair_round(engine, players, games)
+
+    monkeypatch.setattr(app, "pair_round", racing)
+
+    async def scenario(api):
+        ids = await setup(api)
+        tournament = ids["tournament"]["id"]
+        await api.ok("POST", f"/tournaments/{tournament}/enroll/mass", {"list": [
+            {"player": player["id"], "team": ids["team"]["id"]} for player in ids["players"][:3]
+        ]})
+        created = await api.ok("POST", f"/tournaments/{tournament}/organize/2")
+        return ids, created["list"]
+
+    ids, created = run_api(scenario)
+    players = [player["id"] for player in ids["players"][:3]]
+    assert calls == [players, [players[2], players[0], players[1]]]
+    assert created[-1] == {"bye": players[1], "round": "2"}
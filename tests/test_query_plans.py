@@ -0,0 +1,9 @@
+"""Hot queries must stay on indexes."""
+from chess_data_api.database import migrate
+from chess_data_api.query_plans import check
+
+
+def test_hot_queries_do_not_scan(tmp_path):
+    path = tmp_path / "plans.db"
+    migrate(path)
+    assert check(path) == {}
@@ -0,0 +1,42 @@
+"""Writes drop the cached documents that embed what they changed."""
+from test_etags import setup
+
+
+def test_writes_invalidate_embedding_documents(run_api):
+    async def scenario(api):
+        ids = await setup(api)
+        cache = api.client.app["CACHE"]
+        white, other = ids["players"][0]["id"], ids["players"][3]["id"]
+        official = ids["officials"][1]["id"]
+        team = await api.ok("POST", "/teams", {"name": "B", "sponsor": "S"})
+        outsider = await api.ok("POST", "/players", {"name": "O Last", "grade": 9, "team": team["id"]})
+        paths = {
+            "tournament": f"/tournaments/{ids['tournament']['id']}",
+            "game": f"/games/{ids['game']['id']}",
+            "white": f"/players/{white}",
+            "other": f"/players/{other}",
+            "team": f"/teams/{ids['team']['id']}",
+            "official": f"/officials/{official}",
+            "outsider": f"/players/{outsider['id']}",
+        }
+
+        async def cached():
+            for path in paths.values():
+                await api.ok("GET", path)
+            assert set(cache.entries) == set(paths.values())
+
+        await cached()
+        await api.ok("PATCH", paths["white"], {"name": "Renamed Player"})
+        # everything that shows the player: its team's members, so its
+        # teammates' documents too, and every game it plays in
+        assert set(cache.entries) == {paths["official"], paths["outsider"]}
+        assert (await api.ok("GET", paths["game"]))["white"]["name"] == "Renamed Player"
+
+        await cached()
+        await api.ok("POST", f"{paths['game']}/resolve", {"official": official, "result": "draw"})
+        # the game, its tournament and both players' win/draw/loss counts,
+        # which their team documents show as well
+        assert set(cache.entries) == {paths["official"], paths["outsider"]}
+        assert (await api.ok("GET", paths["tournament"]))["games"]["1"][0]["result"] == "draw"
+
+    run_api(scenario)
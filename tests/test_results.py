@@ -0,0 +1,83 @@
+"""Submitting a whole round's results at once."""
+import sqlite3
+from typing import Any, Dict
+
+from test_etags import setup
+
+
+async def round_of_two(api) -> Dict[str, Any]:
+    """Two games in round 1, on boards 0 and 1, between enrolled players."""
+    ids = await setup(api)
+    tournament = ids["tournament"]["id"]
+    players = [player["id"] for player in ids["players"]]
+    await api.ok("POST", f"/tournaments/{tournament}/enroll/mass", {"list": [
+        {"player": player, "team": ids["team"]["id"]} for player in players
+    ]})
+    await api.ok("POST", "/games", {
+        "white": players[2], "black": players[3], "board": 1, "round": 1, "tournament": tournament
+    })
+    return {"tournament": tournament, "players": players, "official": ids["officials"][0]["id"],
+            "path": f"/tournaments/{tournament}/rounds/1/results"}
+
+
+def counters(path) -> Dict[str, Any]:
+    with sqlite3.connect(path) as db:
+        return {
+            "players": db.execute("SELECT id, wins, losses, draws FROM players ORDER BY id").fetchall(),
+            "standings": db.execute(
+                "SELECT player_id, wins, losses, draws, score FROM tournament_standings ORDER BY player_id"
+            ).fetchall(),
+            "games": db.execute("SELECT board, official, result FROM games ORDER BY board").fetchall(),
+        }
+
+
+def test_results_update_counters_and_standings(run_api, tmp_path):
+    async def scenario(api):
+        ids = await round_of_two(api)
+        p = ids["players"]
+        body = await api.ok("POST", ids["path"], {"official": ids["official"], "results": [
+            {"board": 0, "result": p[0]}, {"board": 1, "result": "draw"}
+        ]})
+        assert body["resolved"] == 2
+        return ids
+
+    ids = run_api(scenario)
+    p, official = ids["players"], ids["official"]
+    assert counters(tmp_path / "test.sqlite3") == {
+        "players": [(p[0], 1, 0, 0), (p[1], 0, 1, 0), (p[2], 0, 0, 1), (p[3], 0, 0, 1)],
+        "standings": [(p[0], 1, 0, 0, 1.0), (p[1], 0, 1, 0, 0.0), (p[2], 0, 0, 1, 0.5), (p[3], 0, 0, 1, 0.5)],
+        "games": [(0, official, str(p[0])), (1, official, "draw")],
+    }
+
+
+def test_a_bad_entry_writes_nothing(run_api, tmp_path):
+    async def scenario(api):
+        ids = await round_of_two(api)
+        p, path = ids["players"], ids["path"]
+        before = counters(tmp_path / "test.sqlite3")
+        valid = {"board": 0, "result": p[0]}
+        cases = [
+            # the same board twice
+            ({"official": ids["official"], "results": [valid, {"board": 0, "result": "draw"}]}, 400),
+            # a result that is neither player nor a draw
+            ({"official": ids["official"], "results": [valid, {"board": 1, "result": "white"}]}, 400),
+            ({"official": ids["official"], "results": [valid, {"board": 1, "result": p[0]}]}, 400),
+            # no official at all, or one that does not exist
+            ({"results": [valid, {"board": 1, "result": "draw"}]}, 400),
+            ({"official": ids["official"], "results": [valid, {"board": 1, "result": "draw", "official": 1}]}, 404),
+        ]
+        for body, expected in cases:
+            status, _, _ = await api.call("POST", path, body)
+            assert status == expected, body
+            assert counters(tmp_path / "test.sqlite3") == before
+
+        await api.ok("POST", path, {"official": ids["official"], "results": [{"board": 1, "result": p[3]}]})
+        resolved = counters(tmp_path / "test.sqlite3")
+        status, body, _ = await api.call("POST", path, {"official": ids["official"], "results": [
+            valid, {"board": 1, "result": "draw"}
+        ]})
+        assert status == 409
+        assert "board 1" in body["status"]
+        assert counters(tmp_path / "test.sqlite3") == resolved
+
+    run_api(scenario)
@@ -0,0 +1,104 @@
+"""Round-robin schedules and the schedule endpoint's validation."""
+import itertools
+from collections import Counter
+
+import pytest
+
+from chess_data_api.schedule import berger_rounds, round_robin, team_matches
+
+
+@pytest.mark.parametrize("players", range(2, 15))
+@pytest.mark.parametrize("cycles", [1, 2])
+def test_round_robin_meets_everyone_once_per_cycle(players, cycles):
+    ids = list(range(100, 100 + players))
+    schedule = round_robin(ids, cycles)
+    rounds = players - 1 if players % 2 == 0 else players
+    assert len(schedule.rounds) == rounds * cycles
+
+    meetings = Counter(frozenset((white, black)) for games in schedule.rounds for _, white, black in games)
+    assert meetings == {frozenset(pair): cycles for pair in itertools.combinations(ids, 2)}
+
+    for index, games in enumerate(schedule.rounds):
+        seated = [id for _, white, black in games for id in (white, black)]
+        seated += [id for round, id in schedule.byes if round == index]
+        assert sorted(seated) == ids
+        assert [board for board, _, _ in games] == list(range(len(games)))
+
+    assert Counter(id for _, id in schedule.byes) == ({id: cycles for id in ids} if players % 2 else {})
+
+    whites = Counter(white for games in schedule.rounds for _, white, _ in games)
+    blacks = Counter(black for games in schedule.rounds for _, _, black in games)
+    for id in ids:
+        assert abs(whites[id] - blacks[id]) <= cycles
+
+
+def test_berger_table_for_six():
+    # FIDE Berger table, 6 players: rounds 1 and 2
+    rounds = berger_rounds([1, 2, 3, 4, 5, 6])
+    assert rounds[0] == [(1, 6), (2, 5), (3, 4)]
+    assert rounds[1] == [(6, 4), (5, 3), (1, 2)]
+
+
+def test_team_matches_pair_seats():
+    lineups = {1: [11, 12], 2: [21, 22], 3: [31, 32]}
+    schedule = team_matches(lineups, boards=2)
+    assert len(schedule.rounds) == 3
+    assert Counter(id for _, id in schedule.byes) == {1: 1, 2: 1, 3: 1}
+    for games in schedule.rounds:
+        assert len(games) == 2
+        (_, white_1, black_1), (_, white_2, black_2) = games
+        # seat n meets seat n, colours alternating down the boards
+        assert {white_1 % 10, black_1 % 10} == {1}
+        assert {white_2 % 10, black_2 % 10} == {2}
+        assert white_1 // 10 == black_2 // 10
+
+
+async def tournament_with(api, players: int):
+    team = await api.ok("POST", "/teams", {"name": "A", "sponsor": "S"})
+    ids = [
+        (await api.ok("POST", "/players", {"name": f"P{n} Last", "grade": 10, "team": team["id"]}))["id"]
+        for n in range(players)
+    ]
+    official = await api.ok("POST", "/officials", {"name": "O", "email": "o@x"})
+    tournament = await api.ok("POST", "/tournaments", {
+        "name": "T", "date": 1, "official": official["id"], "location": "L", "boards": 1, "rounds": 0
+    })
+    return tournament["id"], team["id"], ids
+
+
+def test_schedule_rejects_unknown_players(run_api):
+    async def scenario(api) -> None:
+        tournament, _, players = await tournament_with(api, 3)
+        status, body, _ = await api.call("POST", f"/tournaments/{tournament}/schedule", {"players": players + [12345]})
+        assert status == 400
+        assert "12345" in body["reason"]
+        status, body, _ = await api.call("GET", f"/tournaments/{tournament}")
+        assert status == 200
+        assert body["games"] == {}
+
+        document = await api.ok("POST", f"/tournaments/{tournament}/schedule", {"players": players})
+        assert document["games"] == 3
+
+    run_api(scenario)
+
+
+def test_schedule_rejects_unknown_lineups(run_api):
+    async def scenario(api) -> None:
+        tournament, team, players = await tournament_with(api, 2)
+        for lineups in ({"999": players}, {str(team): [players[0], 999]}):
+            status, _, _ = await api.call("POST", f"/tournaments/{tournament}/schedule",
+                                          {"format": "team", "lineups": lineups})
+            assert status == 400
+
+    run_api(scenario)
+
+
+def test_schedule_rejects_empty_schedules(run_api):
+    async def scenario(api) -> None:
+        tournament, _, _ = await tournament_with(api, 0)
+        status, body, _ = await api.call("POST", f"/tournaments/{tournament}/schedule", {})
+        assert status == 400
+        status, body, _ = await api.call("GET", f"/tournaments/{tournament}")
+        assert body["rounds"] == 0
+
+    run_api(scenario)
@@ -0,0 +1,73 @@
+"""Stitching cached fragments must give the same bytes as a plain encode."""
+import json
+
+import pytest
+
+from chess_data_api.serialize import BACKENDS, Serializer, Versioned, versioned
+
+
+def player(id: int, version: int, name: str = "P") -> Versioned:
+    return versioned("player", {"id": id, "version": version}, {"id": id, "type": "player", "name": name})
+
+
+def game(id: int, white: Versioned, black: Versioned) -> Versioned:
+    return versioned("game", {"id": id, "version": 1}, {"id": id, "white": white, "black": black}, white, black, None)
+
+
+def tournament(players):
+    return {
+        "id": 1,
+        "name": "Café \"Open\" \\ \n ☃",
+        "games": {"1": [game(n, players[n], players[(n + 1) % len(players)]) for n in range(len(players))]},
+        "rounds": (1, 2.5, None, True),
+    }
+
+
+def test_stitched_output_equals_a_plain_encode():
+    document = tournament([player(n, 1, f"P{n} é\"") for n in range(5)])
+    stitched = Serializer("json", fragments=100).encode(document)
+    assert stitched == json.dumps(document).encode()
+    assert json.loads(stitched) == json.loads(json.dumps(document))
+
+
+def test_fragments_are_reused_until_their_version_changes():
+    serializer = Serializer("json", fragments=100)
+    players = [player(n, 1) for n in range(3)]
+    first = serializer.encode(tournament(players))
+    # three games and the three players they embed, each player twice
+    assert (serializer.hits, serializer.misses) == (3, 6)
+
+    assert serializer.encode(tournament(players)) == first
+    assert (serializer.hits, serializer.misses) == (6, 6)
+
+    # player 1 renamed: its version moves, and so do the games embedding it
+    players[1] = player(1, 2, "Renamed")
+    changed = serializer.encode(tournament(players))
+    assert changed == json.dumps(tournament(players)).encode()
+    assert b"Renamed" in changed
+    # the two games with player 1 and player 1 itself are encoded again
+    assert (serializer.hits, serializer.misses) == (10, 9)
+
+
+def test_unversioned_embeds_are_not_cached():
+    plain = {"id": 9, "type": "player", "name": "no version"}
+    document = versioned("game", {"id": 1, "version": 1}, {"id": 1, "white": plain}, plain)
+    assert not isinstance(document, Versioned)
+    serializer = Serializer("json", fragments=100)
+    assert serializer.encode(document) == json.dumps(document).encode()
+    assert serializer.misses == 0
+
+
+def test_old_fragments_age_out():
+    serializer = Serializer("json", fragments=2)
+    for version in range(1, 5):
+        serializer.encode(player(1, version))
+    assert list(serializer.fragments) == [("player", 1, 3), ("player", 1, 4)]
+
+
+@pytest.mark.skipif("orjson" not in BACKENDS, reason="orjson is not installed")
+def test_orjson_encodes_whole_documents():
+    serializer = Serializer("orjson", fragments=100)
+    document = tournament([player(n, 1) for n in range(3)])
+    assert json.loads(serializer.encode(document)) == json.loads(json.dumps(document))
+    assert serializer.max_fragments == 0 and serializer.fragments == {}